@@ -2,17 +2,23 @@
 
 import argparse
 import csv
+import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
 from random import randrange
 
 import boto3
+import botocore.session
+from botocore.credentials import CredentialProvider
 from botocore.exceptions import ProfileNotFound
 
 from lib.aws.attacks import Attacks
 from lib.aws.ingestor import *
+from lib.aws.policy import Statement
 from lib.aws.resources import RESOURCES
+from lib.aws.scheduler import Scheduler
 from lib.graph.base import Elements
 from lib.graph.db import Neo4j
 
@@ -105,9 +111,14 @@ def ingest(args):
 
     if not args.region:
         r = boto3.session.Session(profile_name=profile).region_name
-        region = r if r != None else "eu-west-1"
+        regions = [r if r != None else "eu-west-1"]
+    elif args.region.lower() == "all":
+        regions = REGIONS
     else:
-        region = args.region
+        regions = args.region.replace(" ", "").split(',')
+
+    region = regions[0]
+    workers = int(args.workers) if args.workers else 8
 
     if not args.database:
         database = profile+".db"
@@ -187,7 +198,7 @@ def ingest(args):
                 f"                 --only-attacks {','.join(only_attacks)}"
 
     print(f"""
-[+] Running awspx ingest --profile {profile} --region {region} --database {database} \\
+[+] Running awspx ingest --profile {profile} --region {','.join(regions)} --database {database} \\
                      --services {','.join([s.__name__ for s in services])} \\
 {assume_role_arg+optional_resource_args+attack_args}
           """)
@@ -198,7 +209,7 @@ def ingest(args):
         identity = session.client('sts').get_caller_identity()
         account = identity["Account"]
         print(f"[+] User set to {identity['Arn']}.")
-        print(f"[+] Region set to {region}.")
+        print(f"[+] Region set to {', '.join(regions)}.")
     except:
         print("[-] Request to establish identity (sts:GetCallerIdentity) failed.")
 
@@ -218,7 +229,7 @@ def ingest(args):
             identity = session.client('sts').get_caller_identity()
             account = identity["Account"]
             print(f"[+] Running as {identity['Arn']}.")
-            print(f"[+] Region set to {region}.")
+            print(f"[+] Region set to {', '.join(regions)}.")
         except:
             print("[-] Request to establish identity (sts:GetCallerIdentity) failed.")
 
@@ -231,18 +242,49 @@ def ingest(args):
         iam = IAM(session, db=database)
         account = iam.root.account()
 
-    for service in [s for s in services if s != IAM]:
-        resources = service(session, **selections, account=account)
-        ingested += resources
+    ingested += ingest_services(session,
+                                [s for s in services if s != IAM],
+                                regions, selections, account, workers)
 
     if IAM not in services:
         iam = IAM(session, db=database, resources=ingested)
     else:
         iam += ingested
 
-    archive = iam.post()
-    print(f"[+] Results exported to {archive}")
-    Neo4j.load(archive, database)
+    Scheduler.report()
+
+    Statement.collapse = args.collapse_grants
+    IAM.pack = args.pack_actions
+    IAM.compact = args.compact_actions
+    IAM.processes = int(args.resolve_workers) if args.resolve_workers else 1
+
+    state = f"/opt/awspx/data/{database[:-3]}.state.json"
+    previous = None
+
+    if args.incremental:
+        if os.path.isfile(state) and os.path.isdir(f"/data/databases/{database}"):
+            with open(state) as f:
+                previous = json.load(f)
+        else:
+            print(f"[!] No previous ingest found for {database}, "
+                  "falling back to a full ingest.")
+
+    if previous is not None:
+        loaded = iam.update(previous)
+    else:
+        archive = iam.post()
+        print(f"[+] Results exported to {archive}")
+        loaded = Neo4j.load(archive, database) is not False
+
+    if loaded:
+        with open(state, "w") as f:
+            json.dump(iam.state, f)
+
+    if args.keep_denied and len(iam.denied) > 0:
+        denied = f"/opt/awspx/data/{database[:-3]}.denied.json"
+        with open(denied, "w") as f:
+            json.dump(iam.denied.snapshot(iam.owners)["Edges"], f)
+        print(f"[+] Denied actions written to {denied}")
 
     if not args.skip_attacks:
         print("[+] Computing attack paths")
@@ -257,6 +299,80 @@ def ingest(args):
     print("[+] Done.")
 
 
+def ingest_services(session, services, regions, selections, account, workers):
+    """
+    Ingest services across regions concurrently. Every (service, region)
+    pair (global services are only ingested once) is an independent job,
+    run in its own session, on a pool of at most `workers` threads.
+    Results are merged in the order jobs were submitted.
+    """
+
+    ingested = Elements()
+    jobs = []
+
+    for service in services:
+
+        available = session.get_available_regions(service.__name__.lower())
+
+        for region in regions if service.regional else regions[:1]:
+            if available and region not in available:
+                continue
+            jobs.append((service, region))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        futures = [executor.submit(service,
+                                   regional_session(session, region),
+                                   **selections, account=account)
+                   for (service, region) in jobs]
+
+        for (service, region), future in zip(jobs, futures):
+
+            try:
+                resources = future.result()
+            except Exception as e:
+                print(f"[-] Failed to ingest {service.__name__} "
+                      f"from {region}: {e}")
+                continue
+
+            ingested.extend([r for r in resources if r not in ingested])
+
+    return ingested
+
+
+class SharedCredentials(CredentialProvider):
+    """
+    Provides the credentials of another session. These are shared, rather
+    than copied, so that temporary (STS, SSO) credentials are still
+    refreshed (which botocore does safely across threads).
+    """
+
+    METHOD = "awspx-shared"
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+
+    def load(self):
+        return self.credentials
+
+
+def regional_session(session, region):
+    """
+    Create a copy of session for region, using the same profile (and its
+    configuration) and credentials. Sessions are not thread safe, so every
+    concurrent ingestor gets its own.
+    """
+
+    botocore_session = botocore.session.Session(
+        profile=session.profile_name
+        if session.profile_name in session.available_profiles else None)
+    botocore_session.get_component("credential_provider").providers.insert(
+        0, SharedCredentials(session.get_credentials()))
+
+    return boto3.session.Session(botocore_session=botocore_session,
+                                 region_name=region)
+
+
 def attacks(args):
     """
     awspx attacks
@@ -267,6 +383,8 @@ def attacks(args):
         if args.max_attack_depth else ""
     ignore_conditionals = False \
         if args.include_conditionals else True
+    Attacks.workers = int(args.attack_workers) \
+        if args.attack_workers else 1
 
     # Resolve only & except attacks
     except_attacks = []
@@ -334,7 +452,7 @@ def loaded():
     Fetch previously loaded resources and services from the database.
     """
 
-    resources = [r["r"] for r in Neo4j.run(
+    resources = [r["r"] for r in Neo4j.read(
         "MATCH (g:Generic) "
         "WITH [_ IN LABELS(g) "
         "WHERE _ <> 'Generic'][0] AS r "
@@ -410,7 +528,8 @@ def main():
     pnr.add_argument('--assume-role', dest='role_to_assume',
                      help="ARN of role to assume for ingestion. Useful for cross-account ingestion.")
     pnr.add_argument('--region', dest='region',
-                     help="Region to ingest (defaults to profile region, else eu-west-1).")
+                     help=("Comma-separated list of regions to ingest, or 'all' "
+                           "(defaults to profile region, else eu-west-1)."))
     pnr.add_argument('--database', dest='database',
                      help="Name of database to use (defaults to <profile-name>.db).")
 
@@ -419,6 +538,25 @@ def main():
     snr.add_argument('--services', dest='services',
                      help=("Comma-separated list of services to ingest. Supported: IAM, EC2, S3, Lambda. "
                            "IAM will be run regardless of whether it is included here."))
+    snr.add_argument('--workers', dest='workers',
+                     help="Maximum number of services and regions to ingest concurrently (defaults to 8).")
+    snr.add_argument('--resolve-workers', dest='resolve_workers',
+                     help="Number of processes to resolve policies with (defaults to 1).")
+    snr.add_argument('--collapse-grants', dest='collapse_grants', action='store_true',
+                     help=("Represent actions granted on all resources (e.g. \"Resource\": \"*\") as a single grant "
+                           "per action pattern, which is only expanded for the actions attacks require."))
+    snr.add_argument('--pack-actions', dest='pack_actions', action='store_true',
+                     help=("Represent the actions a policy allows (or denies) a principal on a resource "
+                           "as a single edge, rather than as an edge per action."))
+    snr.add_argument('--compact-actions', dest='compact_actions', action='store_true',
+                     help=("Remove allowed actions that are explicitly, and unconditionally, denied to "
+                           "every principal they apply to."))
+    snr.add_argument('--keep-denied', dest='keep_denied', action='store_true',
+                     help=("Write the actions removed by --compact-actions to "
+                           "/opt/awspx/data/<database>.denied.json."))
+    snr.add_argument('--incremental', dest='incremental', action='store_true',
+                     help=("Update the database from the previous ingest, only resolving policies that may "
+                           "have been affected by changes, rather than rebuilding it."))
 
     # Type args
     type_args = snr.add_mutually_exclusive_group()
@@ -461,6 +599,9 @@ def main():
                         help="Maximum search depth for attacks.")
         ag.add_argument('--include-conditionals', dest='include_conditionals', action='store_true',
                         help="Include policy statements with conditionals when computing attacks.")
+        ag.add_argument('--attack-workers', dest='attack_workers',
+                        help=("Number of attacks to search for concurrently (defaults to 1). Only attacks that do "
+                              "not depend on each other are searched concurrently, so results do not change."))
 
         if p is ingest_parser:
             ag.add_argument('--skip-attacks', dest='skip_attacks', action='store_true',
@@ -12,6 +12,7 @@ if True:
     sys.path.append('..')
     from bs4 import BeautifulSoup
     from lib.aws.resources import RESOURCES
+    from lib.aws.numbers import NUMBERS
 
 
 Services = {
@@ -203,6 +204,23 @@ for service, values in Services.items():
 
             Services[service]["Actions"][action] = data
 
+# Action numbers (see lib/aws/numbers.py) are append-only: existing actions
+# keep theirs, even if they no longer appear above, and new actions are
+# numbered after the last of them
+
+Actions = sorted([k for values in Services.values()
+                  for k in values["Actions"].keys()])
+
+Numbers = dict(NUMBERS)
+for action in [a for a in Actions if a not in Numbers]:
+    Numbers[action] = max(Numbers.values(), default=-1) + 1
+
+with open("../lib/aws/numbers.py", "r") as f:
+    header = f.read().split("NUMBERS =")[0]
+
+with open("../lib/aws/numbers.py", "w") as f:
+    f.write(header + "NUMBERS = " + json.dumps(Numbers, indent=2) + "\n")
+
 print("ACTIONS =", json.dumps({k: v for values in Services.values()
                   for k, v in values["Actions"].items()},
                  indent=2,
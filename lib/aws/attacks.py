@@ -3,12 +3,23 @@
 import copy
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from lib.aws.actions import ACTIONS
+from lib.aws.policy import Patterns
 from lib.graph.db import Neo4j
+from lib.graph.edges import ActionSet
 
 
 class Attacks:
 
+    # Number of attack searches run concurrently, on separate sessions.
+    # Every definition creates patterns with its own label, so searches
+    # within an iteration do not conflict; deadlocks between them are
+    # retried by the driver's transaction functions (see Neo4j.write).
+
+    workers = 1
+
     definitions = {
 
         "CreatePolicyVersion": {
@@ -111,8 +122,12 @@ class Attacks:
 
                 "Affects": "AWS::Iam::Role",
 
+                # Roles may trust a principal set (e.g. this account), which
+                # the source is a member of
+
                 "Cypher": [
-                    "(${})<-[:TRUSTS{Name:'sts:AssumeRole'}]-(${AWS::Iam::Role})"
+                    "(${})-[:TRANSITIVE*0..1{Name:'MemberOf'}]->()"
+                    "<-[:TRUSTS{Name:'sts:AssumeRole'}]-(${AWS::Iam::Role})"
                 ],
 
             },
@@ -728,7 +743,8 @@ class Attacks:
             name,
             definition,
             ignore_actions_with_conditions=True,
-            max_search_depth=""):
+            max_search_depth="",
+            iteration=1):
 
         definition = copy.deepcopy(definition)
         attack = definition["Attack"]
@@ -743,6 +759,7 @@ class Attacks:
             "description": definition["Description"],
             "requires_list": attack["Requires"],
             "requires": attack["Requires"],
+            "requires_ids": [str(ActionSet.numbers.get(r, "")) for r in attack["Requires"]],
             "commands": definition["Commands"],
             "attack": name,
             "dependency": attack["Depends"]
@@ -754,6 +771,10 @@ class Attacks:
             "depth": max_search_depth,
             "steps": len(definition["Commands"]),
             "size": len(attack["Requires"]),
+            "requires_pairs": [[r, str(ActionSet.numbers.get(r, ""))] for r in attack["Requires"]],
+            "members": ActionSet.members("edge"),
+            "iteration": iteration,
+            "previous": iteration - 1,
         }
 
         OPTs = {
@@ -894,6 +915,19 @@ class Attacks:
 
             return CONSTRAINTS
 
+        # Patterns record the iteration in which they, or their edges, were last
+        # created. A new result must traverse one of the patterns that changed
+        # since the previous iteration, so only sources that reach one, and the
+        # nodes those sources reach, are searched again (semi-naive evaluation).
+        # The latter ensures intermediaries are still pruned as before. This
+        # requires the closure to include every pattern created before the
+        # iteration started (see Attacks.compute).
+
+        DELTA = (
+            "AND SIZE([(source)<-[:EFFECTIVE*0..1]-()-[:EFFECTIVE]->(changed:Pattern) "
+            "WHERE changed.Generation >= {previous}|changed]) > 0 "
+        ) if iteration > 1 else ""
+
         # If a node, or edge, is identified to grant Admin, it is excluded from
         # search. This is because all patterns incorporating Admin are implied
         # - searching further would be redundant.
@@ -902,7 +936,7 @@ class Attacks:
             "OPTIONAL MATCH (ADMIN:Resource) "
             "WHERE (ADMIN)-[:ATTACK*0..2]->(:Admin) "
             "OR (ADMIN)-[:ATTACK]->(:Pattern)-[:ATTACK{{Admin:True}}]->() "
-            "OPTIONAL MATCH (admin:Resource)-[:ATTACK|TRANSITIVE*0..]->(ADMIN) "
+            "OPTIONAL MATCH (admin:Resource)-[:EFFECTIVE*0..1]->(ADMIN) "
             "WITH  REDUCE(admins=[], _ IN COLLECT(admin)|"
             "CASE WHEN _ IN admins THEN admins "
             "ELSE admins + _ END) AS admin "
@@ -925,6 +959,7 @@ class Attacks:
                 "[:TRANSITIVE|ATTACK|CREATE*0..{depth}]->(option:`{option_type}`) "
                 "WHERE NOT source IN admin AND NOT option IN NODES(path)[1..-1] "
                 "AND (source:Resource OR source:External) AND (option:Resource OR option:Generic) "
+                + DELTA +
 
                 "WITH DISTINCT source, option, admin, "
                 "FILTER(_ IN RELS(path) WHERE STARTNODE(_):Pattern) AS dependencies "
@@ -989,12 +1024,15 @@ class Attacks:
             # and pruning requirements can be safely ommitted.
 
             VARs["requires"] = VARs["requires"][0]
+            VARs["requires_ids"] = VARs["requires_ids"][0]
 
             CYPHER += ' '.join((
-                "MATCH path=(source)-[edge:ACTION{{Name:'{requires}', Effect: 'Allow'}}]"
-                "->(target:`{target_type}`) ",
+                "MATCH path=(source)-[edge:ACTION|ACTIONSET]->(target:`{target_type}`) ",
 
                 "WHERE NOT source:Pattern ",
+                DELTA,
+                "AND (edge.Name = '{requires}' OR '{requires_ids}' IN {members}) ",
+                "AND edge.Effect = 'Allow' ",
                 "AND ALL(_ IN REVERSE(TAIL(REVERSE(NODES(path)))) WHERE NOT _ IN admin) ",
                 "AND edge.Condition = '[]' " if ignore_actions_with_conditions else "",
 
@@ -1011,16 +1049,24 @@ class Attacks:
 
                 "MATCH path=(source)-"
                 "[:TRANSITIVE|ATTACK*0..{depth}]->()"
-                "-[edge:ACTION]->(target:`{target_type}`)",
+                "-[edge:ACTION|ACTIONSET]->(target:`{target_type}`)",
 
                 "WHERE NOT source:Pattern",
+                DELTA,
                 "AND ALL(_ IN REVERSE(TAIL(REVERSE(NODES(path)))) WHERE NOT _ IN admin)",
-                "AND edge.Name IN {requires} AND edge.Effect = 'Allow' ",
+                "AND (edge.Name IN {requires} "
+                "OR ANY(_ IN {members} WHERE _ IN {requires_ids})) ",
+                "AND edge.Effect = 'Allow' ",
                 "AND edge.Condition = '[]' " if ignore_actions_with_conditions else "",
 
                 "%s" % process_cypher() if "Cypher" in attack else "",
 
-                "WITH COLLECT([source, edge.Name, target, path, options, grants]) AS results",
+                # Action sets may satisfy more than one requirement
+
+                "UNWIND [_ IN {requires_pairs} WHERE _[0] = edge.Name",
+                "OR _[1] IN {members}|_[0]] AS name",
+
+                "WITH COLLECT([source, name, target, path, options, grants]) AS results",
 
                 "UNWIND results AS result",
                 "WITH results, result[0] AS source,",
@@ -1056,7 +1102,7 @@ class Attacks:
                 "AND result[2] = target "
 
                 "WITH result[0] AS source, result[2] AS target, ",
-                "result[3] AS path, result[4] AS options, ",
+                "result[1] AS outcome, result[3] AS path, result[4] AS options, ",
                 "result[5] AS grants ",
 
                 # Attack path weight: Each outcome is representative of a distinct
@@ -1065,9 +1111,8 @@ class Attacks:
                 # patterns that must first be executed. This set may be empty, in which case
                 # the associated weight - or the number of steps required - will be zero.
 
-                "WITH source, target, options, grants,",
-                "FILTER(_ IN RELS(path) WHERE STARTNODE(_):Pattern) AS dependencies,",
-                "LAST(EXTRACT(_ IN RELS(path)|_.Name)) AS outcome",
+                "WITH source, target, options, grants, outcome,",
+                "FILTER(_ IN RELS(path) WHERE STARTNODE(_):Pattern) AS dependencies",
 
                 # [source, target, options, outcome, commands, grants]
 
@@ -1116,8 +1161,13 @@ class Attacks:
 
             CYPHER += ' '.join((
 
+                # Reachability alone is needed here, which the closure provides
+                # unless the search depth has been bounded.
+
                 "OPTIONAL MATCH (source)-[:TRANSITIVE|ATTACK*0..{depth}]->()"
-                "-->(:Pattern)-[edge:CREATE]->(target:Generic)",
+                "-[:TRANSITIVE|ATTACK]->(:Pattern)-[edge:CREATE]->(target:Generic)"
+                if max_search_depth != "" else
+                "OPTIONAL MATCH (source)-[:EFFECTIVE]->(:Pattern)-[edge:CREATE]->(target:Generic)",
 
                 # Previous patterns may have already satisfied Dependency requirements. In order
                 # to avoid duplicate steps, weights must be recomputed.
@@ -1169,7 +1219,8 @@ class Attacks:
             "(pattern:Pattern:{attack}{{Name:'{attack}'}})",
             "ON CREATE SET ",
             "pattern.Requires = {requires_list},",
-            "pattern.Depends = \"{dependency}\"",
+            "pattern.Depends = \"{dependency}\",",
+            "pattern.Generation = {iteration}",
 
             "WITH DISTINCT pattern, options, grants",
             "UNWIND grants AS grant",
@@ -1193,7 +1244,9 @@ class Attacks:
             "edge.Description = \"{description}\",",
             "edge.Commands = commands,",
             "edge.Weight = SIZE(commands),",
-            "edge.Option = ID(option)",
+            "edge.Option = ID(option),",
+            "edge.Generation = {iteration},",
+            "pattern.Generation = {iteration}",
             ", edge.Admin = True " if OPTs["Admin"] else "",
 
             # Create pattern options
@@ -1204,7 +1257,9 @@ class Attacks:
             "MERGE (pattern)-[edge:OPTION{{Name:'Option'}}]->(option) "
             "ON CREATE SET "
             "edge.Weight = SIZE(commands), "
-            "edge.Commands = commands " \
+            "edge.Commands = commands, "
+            "edge.Generation = {iteration}, "
+            "pattern.Generation = {iteration} " \
             if ("Depends" in attack and attack["Depends"] != attack["Affects"]) \
             or "Grants" in attack \
             else ""
@@ -1214,6 +1269,201 @@ class Attacks:
 
         return CYPHER
 
+    @staticmethod
+    def _expand_grants(definitions):
+
+        # Grants (see Statement.collapse) are expanded into the actions that
+        # the attack definitions refer to, and only those. These actions are
+        # only used to search for attacks, and are deleted once it completes
+        # (see compute).
+
+        grants = [r["Name"] for r in Neo4j.read(
+            "MATCH ()-[grant:GRANT]->() RETURN DISTINCT grant.Name AS Name")]
+
+        if len(grants) == 0:
+            return
+
+        required = set()
+
+        for definition in definitions.values():
+            required.update(definition["Attack"]["Requires"])
+            required.update(re.findall(r"Name:'([A-Za-z0-9-]+:[A-Za-z0-9]+)'",
+                                       ' '.join(definition["Attack"].get("Cypher", []))))
+
+        print(f"[!] Expanding grants for {len(required)} action(s)")
+
+        created = 0
+
+        for action in sorted([a for a in required if a in ACTIONS]):
+
+            names = [g for g in grants if action in Patterns.expand(g)]
+
+            if len(names) == 0:
+                continue
+
+            summary = Neo4j.write(
+                "MATCH (source)-[grant:GRANT]->() "
+                "WHERE grant.Name IN $names "
+                "WITH source, grant "
+                "MATCH (target) "
+                "WHERE (target:Resource OR target:Generic) "
+                "AND ANY(_ IN LABELS(target) WHERE _ IN $affects) "
+                "MERGE (source)-[action:ACTION{"
+                "Name: $action, Description: $description, Effect: grant.Effect, "
+                "Access: $access, Reference: $reference, Condition: grant.Condition"
+                "}]->(target) "
+                "ON CREATE SET action.Expanded = True",
+                {
+                    "names": names,
+                    "affects": ACTIONS[action]["Affects"],
+                    "action": action,
+                    "description": ACTIONS[action]["Description"],
+                    "access": ACTIONS[action]["Access"],
+                    "reference": ACTIONS[action]["Reference"]
+                }).summary()
+
+            created += summary.counters.relationships_created
+
+        print(f" \\-> Created {created} action(s)")
+
+    @staticmethod
+    def _expand_action_sets(definitions):
+
+        # Attacks test action sets (see ActionSet) for the actions they
+        # require directly. Actions named in Cypher constraints are not, and
+        # are expanded into actions instead, which are deleted once attacks
+        # have been computed (see _expand_grants).
+
+        referenced = set()
+
+        for definition in definitions.values():
+            referenced.update(re.findall(r"Name:'([A-Za-z0-9-]+:[A-Za-z0-9]+)'",
+                                         ' '.join(definition["Attack"].get("Cypher", []))))
+
+        created = 0
+
+        for action in sorted([a for a in referenced if a in ActionSet.numbers]):
+
+            summary = Neo4j.write(
+                "MATCH (source)-[actions:ACTIONSET]->(target) "
+                f"WHERE $number IN {ActionSet.members('actions')} "
+                "MERGE (source)-[action:ACTION{"
+                "Name: $action, Description: $description, Effect: actions.Effect, "
+                "Access: $access, Reference: $reference, Condition: actions.Condition"
+                "}]->(target) "
+                "ON CREATE SET action.Expanded = True",
+                {
+                    "number": str(ActionSet.numbers[action]),
+                    "action": action,
+                    "description": ACTIONS[action]["Description"],
+                    "access": ACTIONS[action]["Access"],
+                    "reference": ACTIONS[action]["Reference"]
+                }).summary()
+
+            created += summary.counters.relationships_created
+
+        if created > 0:
+            print(f"[!] Expanded action sets into {created} action(s)")
+
+    @staticmethod
+    def _closure():
+
+        # Materialise the transitive closure of TRANSITIVE and ATTACK
+        # relationships as (source)-[:EFFECTIVE]->(target) edges, so that
+        # reachability can be tested with a single hop. Relationships that are
+        # not yet reflected in the closure seed it, after which only the edges
+        # created in the previous round (looked up by id) are joined with it
+        # (semi-naive evaluation). This keeps extending the closure, as attacks
+        # are discovered, proportional to what they add.
+
+        created = (
+            "MERGE (source)-[effective:EFFECTIVE]->(target) "
+            "ON CREATE SET effective.Created = True "
+            "WITH effective WHERE EXISTS(effective.Created) "
+            "REMOVE effective.Created "
+            "RETURN ID(effective) AS id"
+        )
+
+        delta = [r["id"] for r in Neo4j.write(
+            "MATCH (source)-[:TRANSITIVE|ATTACK]->(target) "
+            "WHERE source <> target "
+            "AND NOT (source)-[:EFFECTIVE]->(target) "
+            "WITH DISTINCT source, target " + created)]
+
+        total = len(delta)
+
+        while len(delta) > 0:
+
+            extended = []
+
+            for cypher in [
+                    "MATCH (predecessor)-[:EFFECTIVE]->(source)-[effective:EFFECTIVE]->(target) "
+                    "WHERE ID(effective) IN $delta AND predecessor <> target "
+                    "WITH DISTINCT predecessor AS source, target ",
+                    "MATCH (source)-[effective:EFFECTIVE]->(target)-[:EFFECTIVE]->(successor) "
+                    "WHERE ID(effective) IN $delta AND source <> successor "
+                    "WITH DISTINCT source, successor AS target "]:
+
+                extended += [r["id"] for r in Neo4j.write(
+                    cypher + created, {"delta": delta})]
+
+            delta = extended
+            total += len(delta)
+
+        return total
+
+    @staticmethod
+    def _channels(definitions):
+
+        # Derive what every definition consumes and produces. Definitions that
+        # create nodes (CreateAction) produce CREATE edges to Generic nodes of
+        # the type they affect, all others produce ATTACK edges, which any
+        # path expansion may traverse. Paths to dependencies and grants may
+        # also traverse CREATE edges of any type. A definition that tests
+        # direct actions to create nodes consumes neither; attacks can only
+        # add to the admin nodes it excludes.
+
+        created = set("CREATE:%s" % d["Attack"]["Affects"]
+                      for d in definitions.values()
+                      if "CreateAction" in d.get("Options", []))
+
+        channels = {}
+
+        for name, definition in definitions.items():
+
+            attack = definition["Attack"]
+            create = "CreateAction" in definition.get("Options", [])
+            consumes = set()
+
+            if not (create and len(attack["Requires"]) == 1
+                    and "Depends" not in attack and "Cypher" not in attack):
+                consumes.add("ATTACK")
+
+            if not create:
+                consumes.add("CREATE:%s" % attack["Affects"])
+
+            if "Depends" in attack or "Grants" in attack:
+                consumes.update(created)
+
+            produces = set(["CREATE:%s" % attack["Affects"]] if create
+                           else ["ATTACK"])
+
+            channels[name] = (consumes & (created | set(["ATTACK"])), produces)
+
+        return channels
+
+    @staticmethod
+    def dependencies(definitions):
+
+        # Map every definition to the definitions whose patterns it consumes
+        # (e.g. CreatePolicyVersion depends on AttachUserPolicy).
+
+        channels = Attacks._channels(definitions)
+
+        return {name: sorted([n for n, (_, produces) in channels.items()
+                              if len(consumes & produces) > 0])
+                for name, (consumes, _) in channels.items()}
+
     @staticmethod
     def compute(
         max_iterations=5,
@@ -1225,85 +1475,189 @@ class Attacks:
 
         exception = None
 
+        attack_definitions = {k: v for k, v in Attacks.definitions.items()
+                              if k not in except_attacks
+                              and (only_attacks == [] or k in only_attacks)}
+
         print("[!] Removing all existing attack patterns")
 
-        Neo4j().run("MATCH (pattern:Pattern) "
-                    "OPTIONAL MATCH ()-[admin]->(:Admin) "
-                    "DETACH DELETE pattern, admin")
+        Neo4j.write("MATCH (pattern:Pattern) "
+                   "OPTIONAL MATCH ()-[admin]->(:Admin) "
+                   "DETACH DELETE pattern, admin")
+
+        Neo4j.write("MATCH ()-[effective:EFFECTIVE]->() DELETE effective")
+        Neo4j.write("MATCH ()-[action:ACTION]->() "
+                    "WHERE EXISTS(action.Expanded) DELETE action")
+
+        Attacks._expand_grants(attack_definitions)
+        Attacks._expand_action_sets(attack_definitions)
 
         print("[!] Creating pseudo admin")
-        Neo4j().run(Attacks._admin_cypher())
+        Neo4j.write(Attacks._admin_cypher())
 
         # Temporarily set generic policy to admin. This is
         # because all attack paths that allow for reaching
         # this node implicitly grant admin.
 
-        Neo4j().run("MATCH (policy:Generic:Policy) SET policy:Admin")
+        Neo4j.write("MATCH (policy:Generic:Policy) SET policy:Admin")
+
+        print("[!] Materialising effective (transitive) relationships")
+        print(f" \\-> Created {Attacks._closure()} relationship(s)")
 
         # Identify any new attack paths, we stop when we've
         # converged or when we've exceeded the maximum number
         # of iterations.
 
-        attack_definitions = {k: v for k, v in Attacks.definitions.items()
-                              if k not in except_attacks
-                              and (only_attacks == [] or k in only_attacks)}
+        # Definitions are only searched again when a definition they depend on
+        # has discovered attacks since they were last searched. Searches and
+        # their results are ordered by a common clock, so that searches which
+        # ran concurrently with a discovery they depend on are also repeated.
+
+        # Consecutive definitions that neither consume what the other
+        # produces (see _channels) are searched concurrently, as a batch.
+        # The closure is extended between batches, so that every search sees
+        # what it would have seen had the definitions been searched one at a
+        # time, in order.
+
+        channels = Attacks._channels(attack_definitions)
+        changed = {}
+        searched = {}
+        clock = 0
+        skipped = 0
+        discovered = 0
+        created = 0
+        grown = False
+
+        def search(cypher):
+            return Neo4j.write(cypher).summary()
+
+        batch = {}
+
+        def completed(name, summary):
+
+            nonlocal clock, discovered, created, grown
+
+            clock += 1
+            execution_time = (summary.result_available_after +
+                              summary.result_consumed_after) / 1000
+            discovered += summary.counters.nodes_created
+
+            if ((summary.counters.nodes_created + summary.counters.relationships_created) > 0):
+
+                print(f" \\-> Discovered {summary.counters.nodes_created} new attack(s)"
+                      + (f" for {name}" if Attacks.workers > 1 else ""),
+                      f"(took: {execution_time} s).")
+                created += summary.counters.nodes_created + \
+                    summary.counters.relationships_created
+
+                changed.update({c: clock for c in channels[name][1]})
+                grown = True
+
+        def flush():
+
+            nonlocal exception, grown
+
+            grown = False
+
+            for future in as_completed(batch):
+                exception = batch[future]
+                completed(exception, future.result())
+
+            batch.clear()
+
+            # Attacks found by this batch extend the closure, which the
+            # definitions that follow depend on
+
+            if grown:
+                Attacks._closure()
 
         try:
-            discovered = 0
             _ = 0
-            for _ in range(1, max_iterations + 1):
+            with ThreadPoolExecutor(max_workers=Attacks.workers) as executor:
+
+                for _ in range(1, max_iterations + 1):
+
+                    attack = 0
+                    created = 0
 
-                attack = 0
-                created = 0
+                    for name, definition in attack_definitions.items():
 
-                for name, definition in attack_definitions.items():
+                        exception = name
+                        attack += 1
 
-                    exception = name
-                    attack += 1
+                        (consumes, produces) = channels[name]
 
-                    print("[!] Searching for attack "
-                          f"{attack}/{len(attack_definitions)}: "
-                          f"{name} (iteration: {_} of max: {max_iterations})")
+                        if any(len(consumes & channels[n][1]) > 0
+                               or len(produces & channels[n][0]) > 0
+                               for n in batch.values()):
+                            flush()
 
-                    cypher = Attacks._pattern_cypher(
-                        name,
-                        definition,
-                        max_search_depth=max_search_depth,
-                        ignore_actions_with_conditions=ignore_actions_with_conditions
-                    )
+                        if name in searched and not any(
+                                changed.get(c, -1) >= searched[name]
+                                for c in consumes):
+                            skipped += 1
+                            continue
 
-                    summary = Neo4j().run(cypher).summary()
+                        clock += 1
+                        searched[name] = clock
 
-                    execution_time = (summary.result_available_after +
-                                      summary.result_consumed_after) / 1000
-                    discovered += summary.counters.nodes_created
+                        print("[!] Searching for attack "
+                              f"{attack}/{len(attack_definitions)}: "
+                              f"{name} (iteration: {_} of max: {max_iterations})")
 
-                    if ((summary.counters.nodes_created + summary.counters.relationships_created) > 0):
+                        cypher = Attacks._pattern_cypher(
+                            name,
+                            definition,
+                            max_search_depth=max_search_depth,
+                            ignore_actions_with_conditions=ignore_actions_with_conditions,
+                            iteration=_
+                        )
 
-                        print(f" \-> Discovered {summary.counters.nodes_created} new attack(s)",
-                              f"(took: {execution_time} s).")
-                        created += summary.counters.nodes_created + \
-                            summary.counters.relationships_created
+                        batch[executor.submit(search, cypher)] = name
 
-                # If edges are created but not nodes this loop will not break
+                    flush()
 
-                if created == 0:
-                    break
+                    # If edges are created but not nodes this loop will not break
+
+                    if created == 0:
+                        break
 
             print("[+] Converged after" if _ <= max_iterations
                   else "[!] Failed to converge within max:",
                   f"{_} iterations. {discovered} patterns were discovered.")
 
+            if skipped > 0:
+                print(f" \\-> Skipped {skipped} search(es) for attacks "
+                      "whose dependencies discovered nothing new.")
+
             exception = None
 
         except Exception as e:
             print(f"[-] Neo4j returned:\n\n{e}")
             print("[!] Don't worry, we'll use what we already have")
 
+        finally:
+
+            # The closure is only used to search for attacks, and is not
+            # part of the graph that is stored.
+
+            Neo4j.write("MATCH ()-[effective:EFFECTIVE]->() DELETE effective")
+
+            # As are the actions grants and action sets were expanded into
+
+            Neo4j.write("MATCH ()-[action:ACTION]->() "
+                        "WHERE EXISTS(action.Expanded) DELETE action")
+
+            # As is the iteration in which patterns were created
+
+            Neo4j.write("MATCH (pattern:Pattern) "
+                        "OPTIONAL MATCH (pattern)-[edge]->() "
+                        "REMOVE pattern.Generation, edge.Generation")
+
         print("[+] Unifying attack pattern representations")
 
         # Remove :Admin (restore generic policy definition)
-        Neo4j().run(
+        Neo4j.write(
             "MATCH (source:Pattern)-[edge]->(policy:`AWS::Iam::Policy`:Generic:Admin) " +
             "MERGE (source)-[admin:ADMIN]->(policy) " +
             "ON CREATE SET admin = edge " +
@@ -1315,7 +1669,7 @@ class Attacks:
         # Note to self: I'm not sure why we've chosen to flatten
         # (source)-->(pattern)-->(admin)
 
-        Neo4j().run(
+        Neo4j.write(
             "MATCH (admin:Admin), " +
             "path=(source:Resource)-[:ATTACK]->(pattern:Pattern)-[edge:ATTACK{Admin:True}]->(target) " +
             "MERGE (pattern)-[_:ATTACK]->(admin) " +
@@ -1326,7 +1680,7 @@ class Attacks:
         # to all 'Commands' present in the attack.
 
         # TODO: Need to work out whether a description is referencing the same edge for collection
-        Neo4j().run(
+        Neo4j.write(
             "MATCH ()-[attack:ATTACK]->() " +
             "WITH attack UNWIND attack.Commands AS command " +
             "OPTIONAL MATCH (:Pattern)-[_]->() " +
@@ -1,35 +1,49 @@
 import copy
 import re
 import json
+import multiprocessing
 import zlib
 import inflect
 from base64 import b64decode
 from functools import reduce
 
 import boto3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from lib.aws.actions import ACTIONS
 from lib.aws.resources import RESOURCES
+from lib.aws.scheduler import Scheduler
 
-from lib.graph.base import Elements
-from lib.graph.edges import Action, Associative, Transitive, Trusts
-from lib.graph.nodes import Generic, Resource
+from lib.graph.base import Elements, Node
+from lib.graph.edges import Action, ActionSet, Associative, Transitive, Trusts
+from lib.graph.nodes import External, Generic, Resource
 from lib.graph.db import Neo4j
 
-from lib.aws.policy import BucketACL, IdentityBasedPolicy, ResourceBasedPolicy
+from lib.aws.policy import ArnIndex, BucketACL, IdentityBasedPolicy, Patterns, ResourceBasedPolicy, Statement
 
 
 class Ingestor(Elements):
 
     run = []
     associates = []
+    regional = True
+
+    # Per-resource (enrichment) API calls are made concurrently, by at most
+    # this many workers, each call timing out after this many seconds.
+
+    workers = 16
+    timeout = 30
 
     def __init__(self, session, account="0000000000000", default=True, only_types=[], except_types=[], only_arns=[], except_arns=[]):
 
         self.session = session
         self.account_id = account
 
+        if session is not None:
+            Scheduler.attach(session)
+
         if not (self._resolve_type_selection(only_types, except_types)
                 and self._resolve_arn_selection(only_arns, except_arns)):
             return
@@ -123,12 +137,16 @@ class Ingestor(Elements):
             # Note: Depending on the stage at which the exception is thrown, we
             # may miss certain resources.
 
-            resources = [r for r in getattr(
-                boto_base_resource, collection).all()]
+            resources = self._call(
+                boto_base_resource.meta.client,
+                lambda: [r for r in getattr(boto_base_resource, collection).all()])
+
+        except ClientError as e:
+            print(f"[-] Couldn't load {collection} of {boto_base_resource} "
+                  f"({e.response.get('Error', {}).get('Code')}).")
 
         except Exception as e:
-            print(f"Couldn't load {collection} of {boto_base_resource} "
-                  "- probably due to a resource based policy or something.")
+            print(f"[-] Couldn't load {collection} of {boto_base_resource} ({e}).")
 
         for resource in resources:
 
@@ -182,9 +200,80 @@ class Ingestor(Elements):
                 self._load_resources(resource, r)
 
             # Return when we've seen all explicit resources
-            if self.only_arns and all([r in map(lambda x: x.id(), self) for r in self.only_arns]):
+            if self.only_arns and all([self.find(r) is not None for r in self.only_arns]):
                 return
 
+    def _client(self, service):
+        """
+        Create a client for service, suitable for concurrent use.
+        """
+
+        return self.session.client(service, config=Config(
+            connect_timeout=self.timeout,
+            read_timeout=self.timeout,
+            max_pool_connections=self.workers))
+
+    def _enrich(self, description, function, elements, probe=False):
+        """
+        Call function for every element concurrently, reporting progress.
+        If probe is set, the first element is used to establish whether we
+        are permitted to make these calls at all before fanning out.
+        """
+
+        elements = list(elements)
+        (done, failed) = (0, 0)
+
+        if len(elements) == 0:
+            return
+
+        if probe:
+
+            # Only a denial ends enrichment. Any other error belongs to this
+            # resource alone (throttling has already been retried, see _call)
+
+            try:
+                function(elements[0])
+            except Exception as e:
+                code = e.response.get("Error", {}).get("Code") \
+                    if isinstance(e, ClientError) else None
+                if code in ["AccessDenied", "AccessDeniedException",
+                            "UnauthorizedOperation"]:
+                    print(f"[-] {description}: not authorised ({code}), skipping.")
+                    return
+                failed += 1
+                print(f"[-] {description} failed for {elements[0]}: {e}")
+
+            done += 1
+
+        print(f"[+] {description} for {len(elements)} resource(s)")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+
+            futures = {executor.submit(function, e): e
+                       for e in elements[done:]}
+
+            for future in as_completed(futures):
+
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[-] {description} failed for {futures[future]}: {e}")
+
+                done += 1
+                if done % max(1, len(elements) // 10) == 0 \
+                        or done == len(elements):
+                    print(f" \\-> {done}/{len(elements)} "
+                          f"({failed} failed)")
+
+    def _call(self, client, function, *args, **kwargs):
+        """
+        Call function, which makes requests through client, retrying it
+        (through the scheduler) if throttled.
+        """
+
+        return Scheduler.call(client, function, *args, **kwargs)
+
     def _get_resource_arn(self, resource, base_resource):
 
         resource_type = resource.__class__.__name__.split(".")[-1]
@@ -264,6 +353,34 @@ class Ingestor(Elements):
 
         edges = Elements()
 
+        # Resources are joined on their foreign keys: each type's resources
+        # are indexed by the value of the key that identifies them (e.g.
+        # SubnetId), as it appears in their ARN. Edges are deduplicated by
+        # their (source, target) pairs, in either direction.
+
+        indexes = {}
+        pairs = set([(e.source().id(), e.target().id())
+                     for e in self.get("ASSOCIATIVE")])
+
+        def index(label, fk):
+
+            if label not in indexes:
+
+                (head, tail) = RESOURCES.definition(label).format(
+                    Account=self.account_id,
+                    Region=self.session.region_name,
+                    **{fk: "\0"}).split("\0")
+
+                indexes[label] = {}
+
+                for r in self.get(label):
+                    if r.id().startswith(head) and r.id().endswith(tail) \
+                            and len(r.id()) > len(head) + len(tail):
+                        indexes[label].setdefault(
+                            r.id()[len(head):len(r.id()) - len(tail)], r)
+
+            return indexes[label]
+
         for resource in self.get("Resource"):
 
             references = {}
@@ -299,17 +416,9 @@ class Ingestor(Elements):
 
                 for v in list(references[fk]):
 
-                    # Find the first resource matching the reference
+                    # Find the resource matching the reference
 
-                    r = next((r for r in self if re.compile(
-                        RESOURCES.definition(rel[i]).format(
-                            Account=self.account_id,
-                            Region=self.session.region_name,
-                            **{
-                                **{x: list(y)[0] for x, y in references.items() if len(y) == 1},
-                                **{fk: v}
-                            })
-                    ).match(r.id()) is not None), None)
+                    r = index(rel[i], fk).get(v)
 
                     if r is None:
                         # print("Failed to match (%s: %s) against any resources" % (k, v))
@@ -327,13 +436,13 @@ class Ingestor(Elements):
 
                     (source, target) = (resource, r) if i == 1 else (r, resource)
 
-                    edge = Associative(
-                        properties={"Name": "Attached"}, source=source, target=target)
-                    opposite_edge = Associative(
-                        properties={"Name": "Attached"}, source=target, target=source)
+                    if (source.id(), target.id()) in pairs \
+                            or (target.id(), source.id()) in pairs:
+                        continue
 
-                    if (edge not in self and opposite_edge not in self) and edge not in edges:
-                        edges.append(edge)
+                    pairs.add((source.id(), target.id()))
+                    edges.append(Associative(
+                        properties={"Name": "Attached"}, source=source, target=target))
 
         self.extend(edges)
 
@@ -419,15 +528,48 @@ class Ingestor(Elements):
 
 class IAM(Ingestor):
 
+    regional = False
+
+    # Pack the actions each policy produces for a (source, target) pair into
+    # one edge (see ActionSet)
+
+    pack = False
+
+    # Remove allowed actions that are explicitly denied (see _compact)
+
+    compact = False
+
+    # Number of processes policies are resolved by (see _resolve_shards)
+
+    processes = 1
+
+    IDP = [
+        "AWS::Iam::User",
+        "AWS::Iam::Role",
+        "AWS::Iam::Group",
+        "AWS::Iam::Policy"
+    ]
+
+    RBP = {
+        "AWS::S3::Bucket": "Policy",
+        "AWS::Iam::Role": "Trusts"
+    }
+
+    # Set in worker processes only (see _resolve_shards)
+
+    _worker = None
+
     def __init__(self, session, resources=None, db="default.db"):
 
         super().__init__(session=session, default=False)
 
         self._db = db
+        self.owners = {}
+        self.denied = Elements()
 
         if resources is None:
 
-            self.client = self.session.client("iam")
+            self.client = self._client("iam")
 
             print("[+] Ingesting AWS::Iam::Users, AWS::Iam::Roles, ",
                   "AWS::Iam::Groups, AWS::Iam::Policies, "
@@ -516,9 +658,10 @@ class IAM(Ingestor):
 
             return element
 
-        account_authorization_details = [aad for aad in self.client.get_paginator(
-            "get_account_authorization_details"
-        ).paginate()]
+        account_authorization_details = self._call(self.client, lambda: [
+            aad for aad in self.client.get_paginator(
+                "get_account_authorization_details"
+            ).paginate()])
 
         account_authorization_details = [
             (label.replace("DetailList", "").replace("Policies", "Policy"), entry)
@@ -532,7 +675,7 @@ class IAM(Ingestor):
         # User|Group|Role - Attached -> Policy
 
         for (s, t) in edges["Policies"]:
-            t = next(entry for entry in elements if entry.id() == t)
+            t = elements.find(t)
             elements.append(Transitive(
                 properties={"Name": "Attached"}, source=s, target=t))
 
@@ -555,10 +698,11 @@ class IAM(Ingestor):
 
     def get_login_profile(self):
 
-        for user in self.get("AWS::Iam::User").get("Resource"):
+        def get_login_profile(user):
 
             try:
-                login_profile = self.client.get_login_profile(
+                login_profile = self._call(
+                    self.client, self.client.get_login_profile,
                     UserName=user.get("Name"))["LoginProfile"]
                 del login_profile["UserName"]
                 user.set("LoginProfile", login_profile)
@@ -566,12 +710,16 @@ class IAM(Ingestor):
             except self.client.exceptions.NoSuchEntityException:
                 pass
 
+        self._enrich("Retrieving login profiles", get_login_profile,
+                     self.get("AWS::Iam::User").get("Resource"), probe=True)
+
     def list_access_keys(self):
 
-        for user in self.get("AWS::Iam::User").get("Resource"):
+        def list_access_keys(user):
 
             try:
-                access_keys = self.client.list_access_keys(
+                access_keys = self._call(
+                    self.client, self.client.list_access_keys,
                     UserName=user.get("Name"))[
                     "AccessKeyMetadata"]
 
@@ -588,11 +736,144 @@ class IAM(Ingestor):
             except self.client.exceptions.NoSuchEntityException:
                 pass
 
+        self._enrich("Retrieving access keys", list_access_keys,
+                     self.get("AWS::Iam::User").get("Resource"), probe=True)
+
     def post(self):
+        nodes = self.snapshot()["Nodes"]
         self.resolve()
         self.transitive()
+        self.state = self.snapshot(self.owners, nodes)
         return self.save(self._db)
 
+    def update(self, previous):
+
+        # Apply this run to the database loaded by a previous one, given that
+        # run's snapshot, rather than rebuilding it. Only the policies of
+        # resources that changed, or that may refer to resources that were
+        # added or removed, are resolved again: the actions produced by every
+        # other resource are carried forward.
+
+        nodes = self.snapshot()["Nodes"]
+        changed = set(nodes) ^ set(previous["Nodes"])
+
+        holders = set([r.id() for r in self.get("Resource")
+                       if r.id() not in previous["Nodes"]
+                       or previous["Nodes"][r.id()]["Digest"] != nodes[r.id()]["Digest"]
+                       or self._affected(r, changed)])
+
+        # A deny may remove actions produced by any other policy (see
+        # _compact), so every policy must be resolved again
+
+        if IAM.compact:
+            holders = set([r.id() for r in self.get("Resource")])
+
+        print(f"[+] {len(changed)} resource(s) added or removed, "
+              f"{len(holders)} resource policies need to be resolved")
+
+        self.resolve(holders)
+        self.transitive()
+        self.state = self.snapshot(self.owners, nodes)
+
+        for k, e in previous["Edges"].items():
+
+            if e["Owner"] is None \
+                    or e["Owner"] in holders \
+                    or e["Owner"] not in nodes \
+                    or k in self.state["Edges"]:
+                continue
+
+            if all([x[0] == "External" or x[2] in nodes
+                    for x in [e["Source"], e["Target"]]]):
+                self.state["Edges"][k] = e
+
+        # Carried forward actions may refer to principal sets that the
+        # policies resolved above did not
+
+        members = Elements([m for m in self._members(
+            [x[2] for e in self.state["Edges"].values()
+             for x in [e["Source"], e["Target"]]])
+            if m not in self])
+
+        for principal in [m.target() for m in members]:
+            if principal not in self:
+                self.append(principal)
+
+        self.extend(members)
+        self.state["Edges"].update(members.snapshot()["Edges"])
+
+        updated = [{"Label": "External" if e.type("External") else nodes[e.id()]["Label"],
+                    "Key": e._key,
+                    "Id": e.id(),
+                    "Labels": e.labels(),
+                    "Properties": e.export()}
+                   for e in self if isinstance(e, Node)
+                   and (e.type("External")
+                        or e.id() not in previous["Nodes"]
+                        or previous["Nodes"][e.id()]["Digest"] != nodes[e.id()]["Digest"])]
+
+        return Neo4j.update(
+            self._db,
+            nodes=updated,
+            edges=[e for k, e in self.state["Edges"].items()
+                   if k not in previous["Edges"]],
+            deleted_nodes=[dict(n, Id=k) for k, n in previous["Nodes"].items()
+                           if k not in nodes],
+            deleted_edges=[e for k, e in previous["Edges"].items()
+                           if k not in self.state["Edges"]])
+
+    def _affected(self, resource, changed):
+
+        # Whether any of resource's policies could refer to one of `changed`
+        # (ids). This errs on the side of caution: negated elements, ACLs and
+        # patterns that cannot be compiled all count.
+
+        if len(changed) == 0:
+            return False
+
+        if "ACL" in resource.properties():
+            return True
+
+        def statements(o):
+            if isinstance(o, dict) and "Statement" in o:
+                yield from o["Statement"] if isinstance(o["Statement"], list) \
+                    else [o["Statement"]]
+            elif isinstance(o, dict) or isinstance(o, list):
+                for v in (o.values() if isinstance(o, dict) else o):
+                    yield from statements(v)
+
+        def strings(o):
+            if isinstance(o, str):
+                yield o
+            elif isinstance(o, dict) or isinstance(o, list):
+                for v in (o.values() if isinstance(o, dict) else o):
+                    yield from strings(v)
+
+        for statement in statements([resource.properties().get(k) for k in
+                                     ["Document", "Documents", "Policy", "Trusts"]]):
+
+            if not isinstance(statement, dict) \
+                    or any([k.startswith("Not") for k in statement.keys()]):
+                return True
+
+            for pattern in strings([statement.get("Resource"),
+                                    statement.get("Principal")]):
+
+                if pattern == "*":
+                    return True
+
+                try:
+                    regex = Patterns.compile(re.sub(
+                        r"\$\{[0-9a-zA-Z:]+\}", "(.*)",
+                        pattern.replace('*', "(.*)") + "$"))
+                except re.error:
+                    return True
+
+                if any([regex.match(c) for c in changed]):
+                    return True
+
+        return False
+
     def transitive(self):
 
         instances = self.get(
@@ -618,9 +899,8 @@ class IAM(Ingestor):
             if "IamInstanceProfile" not in instance.properties():
                 continue
 
-            target = next((ip for ip in instance_profiles
-                           if ip.id() == instance.properties()["IamInstanceProfile"]["Arn"]),
-                          None)
+            target = instance_profiles.find(
+                instance.properties()["IamInstanceProfile"]["Arn"])
 
             del instance.properties()["IamInstanceProfile"]
 
@@ -634,122 +914,413 @@ class IAM(Ingestor):
             if "Role" not in function.properties():
                 continue
 
-            role = next((r for r in roles
-                         if r.id() == function.properties()["Role"]),
-                        None)
+            role = roles.find(function.properties()["Role"])
 
             del function.properties()["Role"]
 
             self.append(Transitive(
                 {"Name": "Attached"}, source=function, target=role))
 
-    def resolve(self):
-
-        IDP = [
-            "AWS::Iam::User",
-            "AWS::Iam::Role",
-            "AWS::Iam::Group",
-            "AWS::Iam::Policy"
-        ]
+    def resolve(self, holders=None):
 
-        RBP = {
-            "AWS::S3::Bucket": "Policy",
-            "AWS::Iam::Role": "Trusts"
-        }
+        # Only the policies of `holders` (resource ids) are resolved if it is
+        # given. Every action is attributed to the resource whose policy
+        # produced it (see owners).
 
         (principals, actions, trusts) = (Elements(), Elements(), Elements())
         resources = self.get("Resource") + self.get("Generic")
+        index = ArnIndex.of(resources)
 
         print("Resolving actions and resources")
 
+        (Statement.hits, Statement.lookups) = (0, 0)
+
+        holders = [r for r in self.get("Resource")
+                   if holders is None or r.id() in holders]
+
+        # Each holder's policies are resolved in turn, or by a pool of
+        # processes (see _resolve_shards). Either way, their actions are
+        # merged here, in order.
+
+        if IAM.processes > 1 and len(holders) > 1 \
+                and "fork" in multiprocessing.get_all_start_methods():
+            results = IAM._resolve_shards(holders, resources, index)
+        else:
+            if IAM.processes > 1:
+                print("[!] Processes cannot be forked, "
+                      "policies will be resolved by this process alone")
+            results = (IAM._resolve_policies(IAM._policies(r, resources, index))
+                       for r in holders)
+
         # Resolve actions
-        for resource in self.get("Resource"):
+        for resource, (idp, acl_actions, rbp_actions, acl_principals, rbp_principals) \
+                in zip(holders, results):
+
+            (a, t) = (len(actions), len(trusts))
 
             # Identity Based Policies (Inline and Managed)
 
-            if resource.labels()[0] in IDP:
+            if idp is not None:
 
                 count = len(actions)
-                actions.extend(IdentityBasedPolicy(
-                    resource, resources).resolve())
+                actions.extend(r for r in idp if r not in actions)
 
                 diff = len(actions) - count
                 if diff > 0:
                     print(f"[+] Identity based Policy for `{resource}` "
                           f"resolved to {diff} action(s)")
 
-            if resource.labels()[0] in RBP.keys():
+            # Bucket ACLs
 
-                # Bucket ACLs
+            if acl_actions is not None:
+
+                count = len(actions)
+
+                principals.extend(
+                    [p for p in acl_principals if p not in principals])
+                actions.extend(r for r in acl_actions if r not in actions)
+
+                diff = len(actions) - count
+                if diff > 0:
+                    print(f"[+] Bucket ACL for `{resource}` "
+                          f"resolved to {diff} action(s)")
 
-                if resource.type("AWS::S3::Bucket"):
+            # Resource Based Policies
 
-                    count = len(actions)
-                    acl = BucketACL(resource, resources)
+            if rbp_actions is not None:
 
-                    principals.extend(
-                        [p for p in acl.principals() if p not in principals])
-                    actions.extend(
-                        [a for a in acl.resolve() if a not in actions])
+                count = len(actions)
+                resolved = rbp_actions
 
-                    diff = len(actions) - count
-                    if diff > 0:
-                        print(f"[+] Bucket ACL for `{resource}` "
-                              f"resolved to {diff} action(s)")
+                principals.extend([p for p in rbp_principals
+                                   if p not in principals and
+                                   str(p) != RESOURCES.types["AWS::Account"].format(Account=self.root.account())])
 
-                # Resource Based Policies
+                # TODO: This code should be moved to 'ResourceBasedPolicy' and override resolve().
 
-                rbp = ResourceBasedPolicy(
-                    resource,
-                    resources,
-                    keys=[RBP[resource.labels()[0]]])
+                # For Roles, actions imply a TRUSTS relationship. For both (ACTION and TRUSTS, only actions beginning
+                # with sts:Assume are considered valid.
 
-                if len(rbp.principals()) > 0:
+                for action in [a for a in resolved
+                               if "AWS::Iam::Role" not in resource.labels() or
+                               str(a).startswith("sts:AssumeRole")]:
 
-                    count = len(actions)
-                    resolved = rbp.resolve()
+                    if action.source().type("AWS::Account") \
+                            and action.source().properties()["Arn"].split(':')[4] == self.root.account():
 
-                    principals.extend([p for p in rbp.principals()
-                                       if p not in principals and
-                                       str(p) != RESOURCES.types["AWS::Account"].format(Account=self.root.account())])
+                        # The role trusts this account, which every entity
+                        # is made a member of (see _members)
 
-                    # TODO: This code should be moved to 'ResourceBasedPolicy' and override resolve().
+                        if "AWS::Iam::Role" in resource.labels():
 
-                    # For Roles, actions imply a TRUSTS relationship. For both (ACTION and TRUSTS, only actions beginning
-                    # with sts:Assume are considered valid.
+                            if action.source() not in principals:
+                                principals.append(action.source())
 
-                    for action in [a for a in resolved
-                                   if "AWS::Iam::Role" not in resource.labels() or
-                                   str(a).startswith("sts:AssumeRole")]:
+                            trusts.append(Trusts(properties=action.properties(),
+                                                 source=action.target(),
+                                                 target=action.source()))
 
-                        if action.source().type("AWS::Account") \
-                                and action.source().properties()["Arn"].split(':')[4] == self.root.account():
+                        # This case appears redundant for Buckets
 
-                            if "AWS::Iam::Role" in resource.labels():
+                    else:
+                        actions.append(action)
+                        if "AWS::Iam::Role" in resource.labels():
+                            trusts.append(Trusts(properties=action.properties(),
+                                                 source=action.target(),
+                                                 target=action.source()))
 
-                                trusts.extend([Trusts(properties=action.properties(),
-                                                      source=action.target(),
-                                                      target=e)
-                                               for e in self.entities])
+                diff = len(actions) - count
 
-                            # This case appears redundant for Buckets
+                if diff > 0:
+                    print(f"[+] Resource based policy for `{resource}` "
+                          f"resolved to {diff} action(s)")
 
-                        else:
-                            actions.append(action)
-                            if "AWS::Iam::Role" in resource.labels():
-                                trusts.append(Trusts(properties=action.properties(),
-                                                     source=action.target(),
-                                                     target=action.source()))
+            for e in actions[a:] + trusts[t:]:
+                self.owners.setdefault(e.key(), resource.id())
 
-                    diff = len(actions) - count
+        Statement._cache.clear()
 
-                    if diff > 0:
-                        print(f"[+] Resource based policy for `{resource}` "
-                              f"resolved to {diff} action(s)")
+        if Statement.lookups > 0:
+            print(f"[+] Reused {Statement.hits} of {Statement.lookups} resolved "
+                  f"policy statement(s) ({100 * Statement.hits / Statement.lookups:.1f}%)")
 
         self.extend([p for p in principals if p not in self])
-        self.extend([a for a in actions if a not in self])
+
+        members = Elements([m for m in self._members([str(p) for p in principals])
+                            if m not in self])
+
+        if IAM.compact:
+
+            count = len(actions)
+            (actions, denied) = self._compact(actions, members)
+            self.denied.extend(denied)
+
+            print(f"[+] Removed {count - len(actions)} allowed action(s) "
+                  "that are explicitly denied")
+
+        if IAM.pack:
+
+            (count, owners) = (len(actions), {})
+
+            for a in actions:
+                owners.setdefault(self.owners.get(a.key()), []).append(a)
+
+            actions = Elements()
+
+            for owner, owned in owners.items():
+                for e in ActionSet.pack(owned):
+                    self.owners.setdefault(e.key(), owner)
+                    actions.append(e)
+
+            print(f"[+] Packed {count} action(s) into "
+                  f"{len(actions.get('ACTIONSET'))} action set(s)")
+
+        # Grants target a node representing all resources (see
+        # Statement.collapse)
+
+        for target in [a.target() for a in actions.get("GRANT")]:
+            if target not in self:
+                self.append(target)
+
+        self.extend(a for a in actions if a not in self)
         self.extend(trusts)
+        self.extend(members)
+
+    @staticmethod
+    def _policies(resource, resources, index):
+
+        # The (identity based, bucket ACL, and resource based) policies of
+        # `resource`, if any. Constructing these may modify `resource`.
+
+        idp = IdentityBasedPolicy(resource, resources, index) \
+            if resource.labels()[0] in IAM.IDP else None
+
+        acl = BucketACL(resource, resources, index) \
+            if resource.labels()[0] in IAM.RBP \
+            and resource.type("AWS::S3::Bucket") else None
+
+        rbp = ResourceBasedPolicy(resource, resources,
+                                  keys=[IAM.RBP[resource.labels()[0]]],
+                                  index=index) \
+            if resource.labels()[0] in IAM.RBP else None
+
+        return (idp, acl, rbp)
+
+    @staticmethod
+    def _resolve_policies(policies):
+
+        # Returns the actions of each policy, and the principals of the bucket
+        # ACL and resource based policy, which are only resolved once.
+
+        (idp, acl, rbp) = policies
+
+        acl_principals = acl.principals() if acl is not None else None
+        rbp_principals = rbp.principals() if rbp is not None else None
+
+        return (
+            idp.stream() if idp is not None else None,
+            acl.stream() if acl is not None else None,
+            rbp.resolve() if rbp is not None and len(rbp_principals) > 0 else None,
+            acl_principals,
+            rbp_principals
+        )
+
+    @staticmethod
+    def _resolve_shards(holders, resources, index):
+
+        # Policies are constructed here, and handed to a pool of forked
+        # processes, which inherit them (see _initialize_worker), along with
+        # every resource and the index. Holders are split into contiguous
+        # shards, given by the positions of their policies, and results are
+        # returned in order. Actions and principals are sent back with the ids
+        # of the resources they refer to, rather than copies of them.
+
+        policies = [IAM._policies(r, resources, index) for r in holders]
+
+        size = max(1, len(holders) // (IAM.processes * 8))
+        shards = [range(i, min(i + size, len(holders)))
+                  for i in range(0, len(holders), size)]
+
+        print(f"[+] Resolving the policies of {len(holders)} resource(s) "
+              f"in {len(shards)} shard(s), across {IAM.processes} processes")
+
+        def decode(e):
+            return resources.find(e) if isinstance(e, str) else e
+
+        def decode_edges(edges):
+            if edges is None:
+                return None
+            return [cls(properties=properties,
+                        source=decode(source), target=decode(target))
+                    for (cls, properties, source, target) in edges]
+
+        with ProcessPoolExecutor(max_workers=IAM.processes,
+                                 mp_context=multiprocessing.get_context("fork"),
+                                 initializer=IAM._initialize_worker,
+                                 initargs=(policies, resources)) as executor:
+
+            for (results, hits, lookups) in executor.map(IAM._resolve_shard, shards):
+
+                Statement.hits += hits
+                Statement.lookups += lookups
+
+                for (idp, acl, rbp, acl_principals, rbp_principals) in results:
+                    yield (decode_edges(idp), decode_edges(acl), decode_edges(rbp),
+                           None if acl_principals is None
+                           else [decode(p) for p in acl_principals],
+                           None if rbp_principals is None
+                           else [decode(p) for p in rbp_principals])
+
+    @staticmethod
+    def _initialize_worker(policies, resources):
+        IAM._worker = (policies, resources)
+
+    @staticmethod
+    def _resolve_shard(shard):
+
+        # Runs in a worker process (see _resolve_shards). Properties are sent
+        # as they are exported, which edges sharing a record share, and which
+        # are cheaper to rebuild records from.
+
+        (policies, resources) = IAM._worker
+        exported = {}
+
+        def encode(e):
+            return e.id() if resources.find(e.id()) is e else e
+
+        def export(e):
+            if id(e.properties()) not in exported:
+                exported[id(e.properties())] = (e.properties(), e.export())
+            return exported[id(e.properties())][1]
+
+        def encode_edges(edges):
+            if edges is None:
+                return None
+            return [(type(e), export(e), encode(e.source()), encode(e.target()))
+                    for e in edges]
+
+        (Statement.hits, Statement.lookups) = (0, 0)
+        results = []
+
+        for i in shard:
+
+            (idp, acl, rbp, acl_principals, rbp_principals) = \
+                IAM._resolve_policies(policies[i])
+
+            results.append((encode_edges(idp), encode_edges(acl), encode_edges(rbp),
+                            None if acl_principals is None
+                            else [encode(p) for p in acl_principals],
+                            None if rbp_principals is None
+                            else [encode(p) for p in rbp_principals]))
+
+        return (results, Statement.hits, Statement.lookups)
+
+    def _compact(self, actions, members=[]):
+
+        # An explicit deny overrides any allow, in identity and resource based
+        # policies alike. An allowed action is removed if every principal it
+        # applies to is also denied it, unconditionally. Principals are the
+        # entities, external principals, and nodes without any members, that
+        # the action's source can be reached from (transitively); a principal
+        # is denied an action if the source of that deny is reachable from it.
+        # Returns the remaining (effective) actions, and those removed.
+
+        (parents, children) = ({}, {})
+
+        for e in self.get("TRANSITIVE") + members:
+            parents.setdefault(e.target().id(), []).append(e.source())
+            children.setdefault(e.source().id(), []).append(e.target())
+
+        (denies, grants) = ({}, {})
+
+        for e in actions.get("ACTION"):
+            if e.get("Effect") == "Deny" and len(e.get("Condition")) == 0:
+                denies.setdefault((e.target().id(), str(e)), set()).add(
+                    e.source().id())
+
+        for e in actions.get("GRANT"):
+            if e.get("Effect") == "Deny" and len(e.get("Condition")) == 0:
+                grants.setdefault(e.source().id(), set()).update(
+                    Patterns.expand(str(e)))
+
+        if len(denies) == 0 and len(grants) == 0:
+            return (actions, Elements())
+
+        entities = set([e.id() for e in self.entities])
+        (principals, reachable) = ({}, {})
+
+        def walk(node, edges):
+            (seen, stack) = ({node.id(): node}, [node])
+            while len(stack) > 0:
+                for n in edges.get(stack.pop().id(), []):
+                    if n.id() not in seen:
+                        seen[n.id()] = n
+                        stack.append(n)
+            return seen
+
+        def principals_of(node):
+            if node.id() not in principals:
+                principals[node.id()] = [
+                    n for n in walk(node, parents).values()
+                    if n.id() in entities or n.type("External")
+                    or n.id() not in parents]
+            return principals[node.id()]
+
+        def denied(principal, target, action):
+            if principal.id() not in reachable:
+                reachable[principal.id()] = set(walk(principal, children))
+            return len(reachable[principal.id()] & denies.get((target, action), set())) > 0 \
+                or any([action in grants[s] for s in reachable[principal.id()]
+                        if s in grants])
+
+        (effective, removed) = (Elements(), Elements())
+
+        for e in actions:
+
+            if e.labels() == ["ACTION"] and e.get("Effect") == "Allow" \
+                    and ((e.target().id(), str(e)) in denies or len(grants) > 0) \
+                    and len(principals_of(e.source())) > 0 \
+                    and all([denied(p, e.target().id(), str(e))
+                             for p in principals_of(e.source())]):
+                removed.append(e)
+            else:
+                effective.append(e)
+
+        return (effective, removed)
+
+    def _members(self, principals):
+
+        # Some principals stand for a set of entities: any AWS principal, and
+        # any principal in this account. Rather than relating every entity
+        # to whatever these are related to, every entity is made a member of
+        # them, so that the set is expanded implicitly, like a group.
+
+        symbols = {
+            RESOURCES.types["AWS::Account"]: "All AWS Accounts",
+            RESOURCES.types["AWS::Account"].format(
+                Account=self.root.account()): self.root.account()
+        }
+
+        members = Elements()
+
+        for arn in [p for p in symbols if p in principals]:
+
+            principal = self.find(arn)
+
+            if principal is None:
+                principal = External(
+                    key="Arn",
+                    labels=["AWS::Account"],
+                    properties={
+                        "Name": symbols[arn],
+                        "Arn": arn
+                    })
+
+            members.extend([Transitive({"Name": "MemberOf"},
+                                       source=e, target=principal)
+                            for e in self.entities])
+
+        return members
 
 
 class EC2(Ingestor):
@@ -797,22 +1368,32 @@ class EC2(Ingestor):
 
     def get_instance_user_data(self):
 
-        client = self.session.client(self.__class__.__name__.lower())
+        client = self._client(self.__class__.__name__.lower())
+        instances = self.get("AWS::Ec2::Instance").get("Resource")
 
-        for instance in self.get("AWS::Ec2::Instance").get("Resource"):
+        if len(instances) == 0:
+            return
 
-            name = instance.get("Name")
+        # A single DryRun request establishes whether we're authorised. Only
+        # a denial ends retrieval, any other error is left to the requests
+        # for each instance (see _enrich)
 
-            try:
-                client.describe_instance_attribute(
-                    Attribute="userData", DryRun=True, InstanceId=name)
-            except ClientError as e:
-                if 'DryRunOperation' not in str(e):
-                    print("EC2: Not authorised to get instance user data.")
+        try:
+            self._call(client, client.describe_instance_attribute,
+                       Attribute="userData", DryRun=True,
+                       InstanceId=instances[0].get("Name"))
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ["UnauthorizedOperation", "AccessDenied"]:
+                print(f"[-] Retrieving instance user data: not authorised ({code}), skipping.")
+                return
+
+        def get_instance_user_data(instance):
 
-            response = client.describe_instance_attribute(Attribute="userData",
-                                                          DryRun=False,
-                                                          InstanceId=name)
+            response = self._call(client, client.describe_instance_attribute,
+                                  Attribute="userData",
+                                  DryRun=False,
+                                  InstanceId=instance.get("Name"))
             if 'UserData' in response.keys() and 'Value' in response['UserData'].keys():
                 userdata = b64decode(response['UserData']['Value'])
                 if userdata[0:2] == b'\x1f\x8b':  # it's gzip data
@@ -823,9 +1404,14 @@ class EC2(Ingestor):
 
                 instance.set("UserData", {"UserData": userdata})
 
+        self._enrich("Retrieving instance user data",
+                     get_instance_user_data, instances)
+
 
 class S3(Ingestor):
 
+    regional = False
+
     run = [
         'buckets',
         'objects',
@@ -841,30 +1427,41 @@ class S3(Ingestor):
         self.get_bucket_policies()
         self.get_bucket_acls()
 
+    # Bucket permissions may differ from one bucket to the next, so these
+    # calls are not probed.
+
     def get_bucket_policies(self):
 
-        sr = self.session.resource(self.__class__.__name__.lower())
+        client = self._client(self.__class__.__name__.lower())
 
-        for bucket in self.get("AWS::S3::Bucket").get("Resource"):
+        def get_bucket_policy(bucket):
             try:
-
-                bucket.set("Policy", json.loads(sr.BucketPolicy(
-                    bucket.get('Name')).policy))
+                bucket.set("Policy", json.loads(self._call(
+                    client, client.get_bucket_policy,
+                    Bucket=bucket.get('Name'))["Policy"]))
             except:  # no policy for this bucket
                 pass
 
+        self._enrich("Retrieving bucket policies", get_bucket_policy,
+                     self.get("AWS::S3::Bucket").get("Resource"))
+
     def get_bucket_acls(self):
 
-        sr = self.session.resource(self.__class__.__name__.lower())
+        client = self._client(self.__class__.__name__.lower())
 
-        for bucket in self.get("AWS::S3::Bucket").get("Resource"):
+        def get_bucket_acl(bucket):
             try:
-                bucket.set("ACL", sr.BucketAcl(bucket.get('Name')).grants)
+                bucket.set("ACL", self._call(
+                    client, client.get_bucket_acl,
+                    Bucket=bucket.get('Name'))["Grants"])
             except ClientError as e:
                 if "AccessDenied" in str(e):
                     print(
                         f"Access denied when getting ACL for {bucket.get('Name')}")
 
+        self._enrich("Retrieving bucket ACLs", get_bucket_acl,
+                     self.get("AWS::S3::Bucket").get("Resource"))
+
 
 class Lambda(Ingestor):
     run = [
@@ -916,9 +1513,9 @@ class Lambda(Ingestor):
 
     def _get_paginated(self, resource_type):
 
-        rs = [r for r in self.client.get_paginator(
+        rs = self._call(self.client, lambda: [r for r in self.client.get_paginator(
             f"list_{resource_type}"
-        ).paginate()]
+        ).paginate()])
 
         full = []
 
@@ -0,0 +1,882 @@
+# Action numbers, as stored in ACTIONSET edges (see lib/graph/edges.py).
+# This table is append-only: numbers are never reused or reassigned, so
+# that graphs and snapshots saved with an older table remain valid.
+# New actions are numbered by extra/update_actions.py.
+
+NUMBERS = {
+  "cloudformation:CancelUpdateStack": 0,
+  "cloudformation:ContinueUpdateRollback": 1,
+  "cloudformation:CreateChangeSet": 2,
+  "cloudformation:CreateStack": 3,
+  "cloudformation:CreateStackInstances": 4,
+  "cloudformation:CreateStackSet": 5,
+  "cloudformation:CreateUploadBucket": 6,
+  "cloudformation:DeleteChangeSet": 7,
+  "cloudformation:DeleteStack": 8,
+  "cloudformation:DeleteStackInstances": 9,
+  "cloudformation:DeleteStackSet": 10,
+  "cloudformation:DescribeAccountLimits": 11,
+  "cloudformation:DescribeChangeSet": 12,
+  "cloudformation:DescribeStackDriftDetectionStatus": 13,
+  "cloudformation:DescribeStackEvents": 14,
+  "cloudformation:DescribeStackInstance": 15,
+  "cloudformation:DescribeStackResource": 16,
+  "cloudformation:DescribeStackResourceDrifts": 17,
+  "cloudformation:DescribeStackResources": 18,
+  "cloudformation:DescribeStackSet": 19,
+  "cloudformation:DescribeStackSetOperation": 20,
+  "cloudformation:DescribeStacks": 21,
+  "cloudformation:DetectStackDrift": 22,
+  "cloudformation:DetectStackResourceDrift": 23,
+  "cloudformation:EstimateTemplateCost": 24,
+  "cloudformation:ExecuteChangeSet": 25,
+  "cloudformation:GetStackPolicy": 26,
+  "cloudformation:GetTemplate": 27,
+  "cloudformation:GetTemplateSummary": 28,
+  "cloudformation:ListChangeSets": 29,
+  "cloudformation:ListExports": 30,
+  "cloudformation:ListImports": 31,
+  "cloudformation:ListStackInstances": 32,
+  "cloudformation:ListStackResources": 33,
+  "cloudformation:ListStackSetOperationResults": 34,
+  "cloudformation:ListStackSetOperations": 35,
+  "cloudformation:ListStackSets": 36,
+  "cloudformation:ListStacks": 37,
+  "cloudformation:SetStackPolicy": 38,
+  "cloudformation:SignalResource": 39,
+  "cloudformation:StopStackSetOperation": 40,
+  "cloudformation:TagResource": 41,
+  "cloudformation:UntagResource": 42,
+  "cloudformation:UpdateStack": 43,
+  "cloudformation:UpdateStackInstances": 44,
+  "cloudformation:UpdateStackSet": 45,
+  "cloudformation:UpdateTerminationProtection": 46,
+  "cloudformation:ValidateTemplate": 47,
+  "cloudwatch:DeleteAlarms": 48,
+  "cloudwatch:DeleteAnomalyDetector": 49,
+  "cloudwatch:DeleteDashboards": 50,
+  "cloudwatch:DescribeAlarmHistory": 51,
+  "cloudwatch:DescribeAlarms": 52,
+  "cloudwatch:DescribeAlarmsForMetric": 53,
+  "cloudwatch:DescribeAnomalyDetectors": 54,
+  "cloudwatch:DisableAlarmActions": 55,
+  "cloudwatch:EnableAlarmActions": 56,
+  "cloudwatch:GetDashboard": 57,
+  "cloudwatch:GetMetricData": 58,
+  "cloudwatch:GetMetricStatistics": 59,
+  "cloudwatch:GetMetricWidgetImage": 60,
+  "cloudwatch:ListDashboards": 61,
+  "cloudwatch:ListMetrics": 62,
+  "cloudwatch:ListTagsForResource": 63,
+  "cloudwatch:PutAnomalyDetector": 64,
+  "cloudwatch:PutDashboard": 65,
+  "cloudwatch:PutMetricAlarm": 66,
+  "cloudwatch:PutMetricData": 67,
+  "cloudwatch:SetAlarmState": 68,
+  "cloudwatch:TagResource": 69,
+  "cloudwatch:UntagResource": 70,
+  "dynamodb:BatchGetItem": 71,
+  "dynamodb:BatchWriteItem": 72,
+  "dynamodb:ConditionCheckItem": 73,
+  "dynamodb:CreateBackup": 74,
+  "dynamodb:CreateGlobalTable": 75,
+  "dynamodb:CreateTable": 76,
+  "dynamodb:DeleteBackup": 77,
+  "dynamodb:DeleteItem": 78,
+  "dynamodb:DeleteTable": 79,
+  "dynamodb:DescribeBackup": 80,
+  "dynamodb:DescribeContinuousBackups": 81,
+  "dynamodb:DescribeGlobalTable": 82,
+  "dynamodb:DescribeGlobalTableSettings": 83,
+  "dynamodb:DescribeLimits": 84,
+  "dynamodb:DescribeReservedCapacity": 85,
+  "dynamodb:DescribeReservedCapacityOfferings": 86,
+  "dynamodb:DescribeStream": 87,
+  "dynamodb:DescribeTable": 88,
+  "dynamodb:DescribeTimeToLive": 89,
+  "dynamodb:GetItem": 90,
+  "dynamodb:GetRecords": 91,
+  "dynamodb:GetShardIterator": 92,
+  "dynamodb:ListBackups": 93,
+  "dynamodb:ListGlobalTables": 94,
+  "dynamodb:ListStreams": 95,
+  "dynamodb:ListTables": 96,
+  "dynamodb:ListTagsOfResource": 97,
+  "dynamodb:PurchaseReservedCapacityOfferings": 98,
+  "dynamodb:PutItem": 99,
+  "dynamodb:Query": 100,
+  "dynamodb:RestoreTableFromBackup": 101,
+  "dynamodb:RestoreTableToPointInTime": 102,
+  "dynamodb:Scan": 103,
+  "dynamodb:TagResource": 104,
+  "dynamodb:UntagResource": 105,
+  "dynamodb:UpdateContinuousBackups": 106,
+  "dynamodb:UpdateGlobalTable": 107,
+  "dynamodb:UpdateGlobalTableSettings": 108,
+  "dynamodb:UpdateItem": 109,
+  "dynamodb:UpdateTable": 110,
+  "dynamodb:UpdateTimeToLive": 111,
+  "ec2:AcceptReservedInstancesExchangeQuote": 112,
+  "ec2:AcceptTransitGatewayVpcAttachment": 113,
+  "ec2:AcceptVpcEndpointConnections": 114,
+  "ec2:AcceptVpcPeeringConnection": 115,
+  "ec2:AdvertiseByoipCidr": 116,
+  "ec2:AllocateAddress": 117,
+  "ec2:AllocateHosts": 118,
+  "ec2:ApplySecurityGroupsToClientVpnTargetNetwork": 119,
+  "ec2:AssignIpv6Addresses": 120,
+  "ec2:AssignPrivateIpAddresses": 121,
+  "ec2:AssociateAddress": 122,
+  "ec2:AssociateClientVpnTargetNetwork": 123,
+  "ec2:AssociateDhcpOptions": 124,
+  "ec2:AssociateIamInstanceProfile": 125,
+  "ec2:AssociateRouteTable": 126,
+  "ec2:AssociateSubnetCidrBlock": 127,
+  "ec2:AssociateTransitGatewayRouteTable": 128,
+  "ec2:AssociateVpcCidrBlock": 129,
+  "ec2:AttachClassicLinkVpc": 130,
+  "ec2:AttachInternetGateway": 131,
+  "ec2:AttachNetworkInterface": 132,
+  "ec2:AttachVolume": 133,
+  "ec2:AttachVpnGateway": 134,
+  "ec2:AuthorizeClientVpnIngress": 135,
+  "ec2:AuthorizeSecurityGroupEgress": 136,
+  "ec2:AuthorizeSecurityGroupIngress": 137,
+  "ec2:BundleInstance": 138,
+  "ec2:CancelBundleTask": 139,
+  "ec2:CancelCapacityReservation": 140,
+  "ec2:CancelConversionTask": 141,
+  "ec2:CancelExportTask": 142,
+  "ec2:CancelImportTask": 143,
+  "ec2:CancelReservedInstancesListing": 144,
+  "ec2:CancelSpotFleetRequests": 145,
+  "ec2:CancelSpotInstanceRequests": 146,
+  "ec2:ConfirmProductInstance": 147,
+  "ec2:CopyFpgaImage": 148,
+  "ec2:CopyImage": 149,
+  "ec2:CopySnapshot": 150,
+  "ec2:CreateCapacityReservation": 151,
+  "ec2:CreateClientVpnEndpoint": 152,
+  "ec2:CreateClientVpnRoute": 153,
+  "ec2:CreateCustomerGateway": 154,
+  "ec2:CreateDefaultSubnet": 155,
+  "ec2:CreateDefaultVpc": 156,
+  "ec2:CreateDhcpOptions": 157,
+  "ec2:CreateEgressOnlyInternetGateway": 158,
+  "ec2:CreateFleet": 159,
+  "ec2:CreateFlowLogs": 160,
+  "ec2:CreateFpgaImage": 161,
+  "ec2:CreateImage": 162,
+  "ec2:CreateInstanceExportTask": 163,
+  "ec2:CreateInternetGateway": 164,
+  "ec2:CreateKeyPair": 165,
+  "ec2:CreateLaunchTemplate": 166,
+  "ec2:CreateLaunchTemplateVersion": 167,
+  "ec2:CreateNatGateway": 168,
+  "ec2:CreateNetworkAcl": 169,
+  "ec2:CreateNetworkAclEntry": 170,
+  "ec2:CreateNetworkInterface": 171,
+  "ec2:CreateNetworkInterfacePermission": 172,
+  "ec2:CreatePlacementGroup": 173,
+  "ec2:CreateReservedInstancesListing": 174,
+  "ec2:CreateRoute": 175,
+  "ec2:CreateRouteTable": 176,
+  "ec2:CreateSecurityGroup": 177,
+  "ec2:CreateSnapshot": 178,
+  "ec2:CreateSnapshots": 179,
+  "ec2:CreateSpotDatafeedSubscription": 180,
+  "ec2:CreateSubnet": 181,
+  "ec2:CreateTags": 182,
+  "ec2:CreateTrafficMirrorFilter": 183,
+  "ec2:CreateTrafficMirrorFilterRule": 184,
+  "ec2:CreateTrafficMirrorSession": 185,
+  "ec2:CreateTrafficMirrorTarget": 186,
+  "ec2:CreateTransitGateway": 187,
+  "ec2:CreateTransitGatewayRoute": 188,
+  "ec2:CreateTransitGatewayRouteTable": 189,
+  "ec2:CreateTransitGatewayVpcAttachment": 190,
+  "ec2:CreateVolume": 191,
+  "ec2:CreateVpc": 192,
+  "ec2:CreateVpcEndpoint": 193,
+  "ec2:CreateVpcEndpointConnectionNotification": 194,
+  "ec2:CreateVpcEndpointServiceConfiguration": 195,
+  "ec2:CreateVpcPeeringConnection": 196,
+  "ec2:CreateVpnConnection": 197,
+  "ec2:CreateVpnConnectionRoute": 198,
+  "ec2:CreateVpnGateway": 199,
+  "ec2:DeleteClientVpnEndpoint": 200,
+  "ec2:DeleteClientVpnRoute": 201,
+  "ec2:DeleteCustomerGateway": 202,
+  "ec2:DeleteDhcpOptions": 203,
+  "ec2:DeleteEgressOnlyInternetGateway": 204,
+  "ec2:DeleteFleets": 205,
+  "ec2:DeleteFlowLogs": 206,
+  "ec2:DeleteFpgaImage": 207,
+  "ec2:DeleteInternetGateway": 208,
+  "ec2:DeleteKeyPair": 209,
+  "ec2:DeleteLaunchTemplate": 210,
+  "ec2:DeleteLaunchTemplateVersions": 211,
+  "ec2:DeleteNatGateway": 212,
+  "ec2:DeleteNetworkAcl": 213,
+  "ec2:DeleteNetworkAclEntry": 214,
+  "ec2:DeleteNetworkInterface": 215,
+  "ec2:DeleteNetworkInterfacePermission": 216,
+  "ec2:DeletePlacementGroup": 217,
+  "ec2:DeleteRoute": 218,
+  "ec2:DeleteRouteTable": 219,
+  "ec2:DeleteSecurityGroup": 220,
+  "ec2:DeleteSnapshot": 221,
+  "ec2:DeleteSpotDatafeedSubscription": 222,
+  "ec2:DeleteSubnet": 223,
+  "ec2:DeleteTags": 224,
+  "ec2:DeleteTrafficMirrorFilter": 225,
+  "ec2:DeleteTrafficMirrorFilterRule": 226,
+  "ec2:DeleteTrafficMirrorSession": 227,
+  "ec2:DeleteTrafficMirrorTarget": 228,
+  "ec2:DeleteTransitGateway": 229,
+  "ec2:DeleteTransitGatewayRoute": 230,
+  "ec2:DeleteTransitGatewayRouteTable": 231,
+  "ec2:DeleteTransitGatewayVpcAttachment": 232,
+  "ec2:DeleteVolume": 233,
+  "ec2:DeleteVpc": 234,
+  "ec2:DeleteVpcEndpointConnectionNotifications": 235,
+  "ec2:DeleteVpcEndpointServiceConfigurations": 236,
+  "ec2:DeleteVpcEndpoints": 237,
+  "ec2:DeleteVpcPeeringConnection": 238,
+  "ec2:DeleteVpnConnection": 239,
+  "ec2:DeleteVpnConnectionRoute": 240,
+  "ec2:DeleteVpnGateway": 241,
+  "ec2:DeprovisionByoipCidr": 242,
+  "ec2:DeregisterImage": 243,
+  "ec2:DescribeAccountAttributes": 244,
+  "ec2:DescribeAddresses": 245,
+  "ec2:DescribeAggregateIdFormat": 246,
+  "ec2:DescribeAvailabilityZones": 247,
+  "ec2:DescribeBundleTasks": 248,
+  "ec2:DescribeByoipCidrs": 249,
+  "ec2:DescribeCapacityReservations": 250,
+  "ec2:DescribeClassicLinkInstances": 251,
+  "ec2:DescribeClientVpnAuthorizationRules": 252,
+  "ec2:DescribeClientVpnConnections": 253,
+  "ec2:DescribeClientVpnEndpoints": 254,
+  "ec2:DescribeClientVpnRoutes": 255,
+  "ec2:DescribeClientVpnTargetNetworks": 256,
+  "ec2:DescribeConversionTasks": 257,
+  "ec2:DescribeCustomerGateways": 258,
+  "ec2:DescribeDhcpOptions": 259,
+  "ec2:DescribeEgressOnlyInternetGateways": 260,
+  "ec2:DescribeElasticGpus": 261,
+  "ec2:DescribeExportTasks": 262,
+  "ec2:DescribeFleetHistory": 263,
+  "ec2:DescribeFleetInstances": 264,
+  "ec2:DescribeFleets": 265,
+  "ec2:DescribeFlowLogs": 266,
+  "ec2:DescribeFpgaImageAttribute": 267,
+  "ec2:DescribeFpgaImages": 268,
+  "ec2:DescribeHostReservationOfferings": 269,
+  "ec2:DescribeHostReservations": 270,
+  "ec2:DescribeHosts": 271,
+  "ec2:DescribeIamInstanceProfileAssociations": 272,
+  "ec2:DescribeIdFormat": 273,
+  "ec2:DescribeIdentityIdFormat": 274,
+  "ec2:DescribeImageAttribute": 275,
+  "ec2:DescribeImages": 276,
+  "ec2:DescribeImportImageTasks": 277,
+  "ec2:DescribeImportSnapshotTasks": 278,
+  "ec2:DescribeInstanceAttribute": 279,
+  "ec2:DescribeInstanceCreditSpecifications": 280,
+  "ec2:DescribeInstanceStatus": 281,
+  "ec2:DescribeInstances": 282,
+  "ec2:DescribeInternetGateways": 283,
+  "ec2:DescribeKeyPairs": 284,
+  "ec2:DescribeLaunchTemplateVersions": 285,
+  "ec2:DescribeLaunchTemplates": 286,
+  "ec2:DescribeMovingAddresses": 287,
+  "ec2:DescribeNatGateways": 288,
+  "ec2:DescribeNetworkAcls": 289,
+  "ec2:DescribeNetworkInterfaceAttribute": 290,
+  "ec2:DescribeNetworkInterfacePermissions": 291,
+  "ec2:DescribeNetworkInterfaces": 292,
+  "ec2:DescribePlacementGroups": 293,
+  "ec2:DescribePrefixLists": 294,
+  "ec2:DescribePrincipalIdFormat": 295,
+  "ec2:DescribePublicIpv4Pools": 296,
+  "ec2:DescribeRegions": 297,
+  "ec2:DescribeReservedInstances": 298,
+  "ec2:DescribeReservedInstancesListings": 299,
+  "ec2:DescribeReservedInstancesModifications": 300,
+  "ec2:DescribeReservedInstancesOfferings": 301,
+  "ec2:DescribeRouteTables": 302,
+  "ec2:DescribeScheduledInstanceAvailability": 303,
+  "ec2:DescribeScheduledInstances": 304,
+  "ec2:DescribeSecurityGroupReferences": 305,
+  "ec2:DescribeSecurityGroups": 306,
+  "ec2:DescribeSnapshotAttribute": 307,
+  "ec2:DescribeSnapshots": 308,
+  "ec2:DescribeSpotDatafeedSubscription": 309,
+  "ec2:DescribeSpotFleetInstances": 310,
+  "ec2:DescribeSpotFleetRequestHistory": 311,
+  "ec2:DescribeSpotFleetRequests": 312,
+  "ec2:DescribeSpotInstanceRequests": 313,
+  "ec2:DescribeSpotPriceHistory": 314,
+  "ec2:DescribeStaleSecurityGroups": 315,
+  "ec2:DescribeSubnets": 316,
+  "ec2:DescribeTags": 317,
+  "ec2:DescribeTrafficMirrorFilters": 318,
+  "ec2:DescribeTrafficMirrorSessions": 319,
+  "ec2:DescribeTrafficMirrorTargets": 320,
+  "ec2:DescribeTransitGatewayAttachments": 321,
+  "ec2:DescribeTransitGatewayRouteTables": 322,
+  "ec2:DescribeTransitGatewayVpcAttachments": 323,
+  "ec2:DescribeTransitGateways": 324,
+  "ec2:DescribeVolumeAttribute": 325,
+  "ec2:DescribeVolumeStatus": 326,
+  "ec2:DescribeVolumes": 327,
+  "ec2:DescribeVolumesModifications": 328,
+  "ec2:DescribeVpcAttribute": 329,
+  "ec2:DescribeVpcClassicLink": 330,
+  "ec2:DescribeVpcClassicLinkDnsSupport": 331,
+  "ec2:DescribeVpcEndpointConnectionNotifications": 332,
+  "ec2:DescribeVpcEndpointConnections": 333,
+  "ec2:DescribeVpcEndpointServiceConfigurations": 334,
+  "ec2:DescribeVpcEndpointServicePermissions": 335,
+  "ec2:DescribeVpcEndpointServices": 336,
+  "ec2:DescribeVpcEndpoints": 337,
+  "ec2:DescribeVpcPeeringConnections": 338,
+  "ec2:DescribeVpcs": 339,
+  "ec2:DescribeVpnConnections": 340,
+  "ec2:DescribeVpnGateways": 341,
+  "ec2:DetachClassicLinkVpc": 342,
+  "ec2:DetachInternetGateway": 343,
+  "ec2:DetachNetworkInterface": 344,
+  "ec2:DetachVolume": 345,
+  "ec2:DetachVpnGateway": 346,
+  "ec2:DisableEbsEncryptionByDefault": 347,
+  "ec2:DisableTransitGatewayRouteTablePropagation": 348,
+  "ec2:DisableVgwRoutePropagation": 349,
+  "ec2:DisableVpcClassicLink": 350,
+  "ec2:DisableVpcClassicLinkDnsSupport": 351,
+  "ec2:DisassociateAddress": 352,
+  "ec2:DisassociateClientVpnTargetNetwork": 353,
+  "ec2:DisassociateIamInstanceProfile": 354,
+  "ec2:DisassociateRouteTable": 355,
+  "ec2:DisassociateSubnetCidrBlock": 356,
+  "ec2:DisassociateTransitGatewayRouteTable": 357,
+  "ec2:DisassociateVpcCidrBlock": 358,
+  "ec2:EnableEbsEncryptionByDefault": 359,
+  "ec2:EnableTransitGatewayRouteTablePropagation": 360,
+  "ec2:EnableVgwRoutePropagation": 361,
+  "ec2:EnableVolumeIO": 362,
+  "ec2:EnableVpcClassicLink": 363,
+  "ec2:EnableVpcClassicLinkDnsSupport": 364,
+  "ec2:ExportClientVpnClientCertificateRevocationList": 365,
+  "ec2:ExportClientVpnClientConfiguration": 366,
+  "ec2:ExportTransitGatewayRoutes": 367,
+  "ec2:GetCapacityReservationUsage": 368,
+  "ec2:GetConsoleOutput": 369,
+  "ec2:GetConsoleScreenshot": 370,
+  "ec2:GetEbsDefaultKmsKeyId": 371,
+  "ec2:GetEbsEncryptionByDefault": 372,
+  "ec2:GetHostReservationPurchasePreview": 373,
+  "ec2:GetLaunchTemplateData": 374,
+  "ec2:GetPasswordData": 375,
+  "ec2:GetReservedInstancesExchangeQuote": 376,
+  "ec2:GetTransitGatewayAttachmentPropagations": 377,
+  "ec2:GetTransitGatewayRouteTableAssociations": 378,
+  "ec2:GetTransitGatewayRouteTablePropagations": 379,
+  "ec2:ImportClientVpnClientCertificateRevocationList": 380,
+  "ec2:ImportImage": 381,
+  "ec2:ImportInstance": 382,
+  "ec2:ImportKeyPair": 383,
+  "ec2:ImportSnapshot": 384,
+  "ec2:ImportVolume": 385,
+  "ec2:ModifyCapacityReservation": 386,
+  "ec2:ModifyClientVpnEndpoint": 387,
+  "ec2:ModifyEbsDefaultKmsKeyId": 388,
+  "ec2:ModifyFleet": 389,
+  "ec2:ModifyFpgaImageAttribute": 390,
+  "ec2:ModifyHosts": 391,
+  "ec2:ModifyIdFormat": 392,
+  "ec2:ModifyIdentityIdFormat": 393,
+  "ec2:ModifyImageAttribute": 394,
+  "ec2:ModifyInstanceAttribute": 395,
+  "ec2:ModifyInstanceCapacityReservationAttributes": 396,
+  "ec2:ModifyInstanceCreditSpecification": 397,
+  "ec2:ModifyInstanceEventStartTime": 398,
+  "ec2:ModifyInstancePlacement": 399,
+  "ec2:ModifyLaunchTemplate": 400,
+  "ec2:ModifyNetworkInterfaceAttribute": 401,
+  "ec2:ModifyReservedInstances": 402,
+  "ec2:ModifySnapshotAttribute": 403,
+  "ec2:ModifySpotFleetRequest": 404,
+  "ec2:ModifySubnetAttribute": 405,
+  "ec2:ModifyTrafficMirrorFilterNetworkServices": 406,
+  "ec2:ModifyTrafficMirrorFilterRule": 407,
+  "ec2:ModifyTrafficMirrorSession": 408,
+  "ec2:ModifyTransitGatewayVpcAttachment": 409,
+  "ec2:ModifyVolume": 410,
+  "ec2:ModifyVolumeAttribute": 411,
+  "ec2:ModifyVpcAttribute": 412,
+  "ec2:ModifyVpcEndpoint": 413,
+  "ec2:ModifyVpcEndpointConnectionNotification": 414,
+  "ec2:ModifyVpcEndpointServiceConfiguration": 415,
+  "ec2:ModifyVpcEndpointServicePermissions": 416,
+  "ec2:ModifyVpcPeeringConnectionOptions": 417,
+  "ec2:ModifyVpcTenancy": 418,
+  "ec2:ModifyVpnConnection": 419,
+  "ec2:MonitorInstances": 420,
+  "ec2:MoveAddressToVpc": 421,
+  "ec2:ProvisionByoipCidr": 422,
+  "ec2:PurchaseHostReservation": 423,
+  "ec2:PurchaseReservedInstancesOffering": 424,
+  "ec2:PurchaseScheduledInstances": 425,
+  "ec2:RebootInstances": 426,
+  "ec2:RegisterImage": 427,
+  "ec2:RejectTransitGatewayVpcAttachment": 428,
+  "ec2:RejectVpcEndpointConnections": 429,
+  "ec2:RejectVpcPeeringConnection": 430,
+  "ec2:ReleaseAddress": 431,
+  "ec2:ReleaseHosts": 432,
+  "ec2:ReplaceIamInstanceProfileAssociation": 433,
+  "ec2:ReplaceNetworkAclAssociation": 434,
+  "ec2:ReplaceNetworkAclEntry": 435,
+  "ec2:ReplaceRoute": 436,
+  "ec2:ReplaceRouteTableAssociation": 437,
+  "ec2:ReplaceTransitGatewayRoute": 438,
+  "ec2:ReportInstanceStatus": 439,
+  "ec2:RequestSpotFleet": 440,
+  "ec2:RequestSpotInstances": 441,
+  "ec2:ResetEbsDefaultKmsKeyId": 442,
+  "ec2:ResetFpgaImageAttribute": 443,
+  "ec2:ResetImageAttribute": 444,
+  "ec2:ResetInstanceAttribute": 445,
+  "ec2:ResetNetworkInterfaceAttribute": 446,
+  "ec2:ResetSnapshotAttribute": 447,
+  "ec2:RestoreAddressToClassic": 448,
+  "ec2:RevokeClientVpnIngress": 449,
+  "ec2:RevokeSecurityGroupEgress": 450,
+  "ec2:RevokeSecurityGroupIngress": 451,
+  "ec2:RunInstances": 452,
+  "ec2:RunScheduledInstances": 453,
+  "ec2:SearchTransitGatewayRoutes": 454,
+  "ec2:SendDiagnosticInterrupt": 455,
+  "ec2:StartInstances": 456,
+  "ec2:StopInstances": 457,
+  "ec2:TerminateClientVpnConnections": 458,
+  "ec2:TerminateInstances": 459,
+  "ec2:UnassignIpv6Addresses": 460,
+  "ec2:UnassignPrivateIpAddresses": 461,
+  "ec2:UnmonitorInstances": 462,
+  "ec2:UpdateSecurityGroupRuleDescriptionsEgress": 463,
+  "ec2:UpdateSecurityGroupRuleDescriptionsIngress": 464,
+  "ec2:WithdrawByoipCidr": 465,
+  "glacier:AbortMultipartUpload": 466,
+  "glacier:AbortVaultLock": 467,
+  "glacier:AddTagsToVault": 468,
+  "glacier:CompleteMultipartUpload": 469,
+  "glacier:CompleteVaultLock": 470,
+  "glacier:CreateVault": 471,
+  "glacier:DeleteArchive": 472,
+  "glacier:DeleteVault": 473,
+  "glacier:DeleteVaultAccessPolicy": 474,
+  "glacier:DeleteVaultNotifications": 475,
+  "glacier:DescribeJob": 476,
+  "glacier:DescribeVault": 477,
+  "glacier:GetDataRetrievalPolicy": 478,
+  "glacier:GetJobOutput": 479,
+  "glacier:GetVaultAccessPolicy": 480,
+  "glacier:GetVaultLock": 481,
+  "glacier:GetVaultNotifications": 482,
+  "glacier:InitiateJob": 483,
+  "glacier:InitiateMultipartUpload": 484,
+  "glacier:InitiateVaultLock": 485,
+  "glacier:ListJobs": 486,
+  "glacier:ListMultipartUploads": 487,
+  "glacier:ListParts": 488,
+  "glacier:ListProvisionedCapacity": 489,
+  "glacier:ListTagsForVault": 490,
+  "glacier:ListVaults": 491,
+  "glacier:PurchaseProvisionedCapacity": 492,
+  "glacier:RemoveTagsFromVault": 493,
+  "glacier:SetDataRetrievalPolicy": 494,
+  "glacier:SetVaultAccessPolicy": 495,
+  "glacier:SetVaultNotifications": 496,
+  "glacier:UploadArchive": 497,
+  "glacier:UploadMultipartPart": 498,
+  "iam:AddClientIDToOpenIDConnectProvider": 499,
+  "iam:AddRoleToInstanceProfile": 500,
+  "iam:AddUserToGroup": 501,
+  "iam:AttachGroupPolicy": 502,
+  "iam:AttachRolePolicy": 503,
+  "iam:AttachUserPolicy": 504,
+  "iam:ChangePassword": 505,
+  "iam:CreateAccessKey": 506,
+  "iam:CreateAccountAlias": 507,
+  "iam:CreateGroup": 508,
+  "iam:CreateInstanceProfile": 509,
+  "iam:CreateLoginProfile": 510,
+  "iam:CreateOpenIDConnectProvider": 511,
+  "iam:CreatePolicy": 512,
+  "iam:CreatePolicyVersion": 513,
+  "iam:CreateRole": 514,
+  "iam:CreateSAMLProvider": 515,
+  "iam:CreateServiceLinkedRole": 516,
+  "iam:CreateServiceSpecificCredential": 517,
+  "iam:CreateUser": 518,
+  "iam:CreateVirtualMFADevice": 519,
+  "iam:DeactivateMFADevice": 520,
+  "iam:DeleteAccessKey": 521,
+  "iam:DeleteAccountAlias": 522,
+  "iam:DeleteAccountPasswordPolicy": 523,
+  "iam:DeleteGroup": 524,
+  "iam:DeleteGroupPolicy": 525,
+  "iam:DeleteInstanceProfile": 526,
+  "iam:DeleteLoginProfile": 527,
+  "iam:DeleteOpenIDConnectProvider": 528,
+  "iam:DeletePolicy": 529,
+  "iam:DeletePolicyVersion": 530,
+  "iam:DeleteRole": 531,
+  "iam:DeleteRolePermissionsBoundary": 532,
+  "iam:DeleteRolePolicy": 533,
+  "iam:DeleteSAMLProvider": 534,
+  "iam:DeleteSSHPublicKey": 535,
+  "iam:DeleteServerCertificate": 536,
+  "iam:DeleteServiceLinkedRole": 537,
+  "iam:DeleteServiceSpecificCredential": 538,
+  "iam:DeleteSigningCertificate": 539,
+  "iam:DeleteUser": 540,
+  "iam:DeleteUserPermissionsBoundary": 541,
+  "iam:DeleteUserPolicy": 542,
+  "iam:DeleteVirtualMFADevice": 543,
+  "iam:DetachGroupPolicy": 544,
+  "iam:DetachRolePolicy": 545,
+  "iam:DetachUserPolicy": 546,
+  "iam:EnableMFADevice": 547,
+  "iam:GenerateCredentialReport": 548,
+  "iam:GenerateOrganizationsAccessReport": 549,
+  "iam:GenerateServiceLastAccessedDetails": 550,
+  "iam:GetAccessKeyLastUsed": 551,
+  "iam:GetAccountAuthorizationDetails": 552,
+  "iam:GetAccountPasswordPolicy": 553,
+  "iam:GetAccountSummary": 554,
+  "iam:GetContextKeysForCustomPolicy": 555,
+  "iam:GetContextKeysForPrincipalPolicy": 556,
+  "iam:GetCredentialReport": 557,
+  "iam:GetGroup": 558,
+  "iam:GetGroupPolicy": 559,
+  "iam:GetInstanceProfile": 560,
+  "iam:GetLoginProfile": 561,
+  "iam:GetOpenIDConnectProvider": 562,
+  "iam:GetOrganizationsAccessReport": 563,
+  "iam:GetPolicy": 564,
+  "iam:GetPolicyVersion": 565,
+  "iam:GetRole": 566,
+  "iam:GetRolePolicy": 567,
+  "iam:GetSAMLProvider": 568,
+  "iam:GetSSHPublicKey": 569,
+  "iam:GetServerCertificate": 570,
+  "iam:GetServiceLastAccessedDetails": 571,
+  "iam:GetServiceLastAccessedDetailsWithEntities": 572,
+  "iam:GetServiceLinkedRoleDeletionStatus": 573,
+  "iam:GetUser": 574,
+  "iam:GetUserPolicy": 575,
+  "iam:ListAccessKeys": 576,
+  "iam:ListAccountAliases": 577,
+  "iam:ListAttachedGroupPolicies": 578,
+  "iam:ListAttachedRolePolicies": 579,
+  "iam:ListAttachedUserPolicies": 580,
+  "iam:ListEntitiesForPolicy": 581,
+  "iam:ListGroupPolicies": 582,
+  "iam:ListGroups": 583,
+  "iam:ListGroupsForUser": 584,
+  "iam:ListInstanceProfiles": 585,
+  "iam:ListInstanceProfilesForRole": 586,
+  "iam:ListMFADevices": 587,
+  "iam:ListOpenIDConnectProviders": 588,
+  "iam:ListPolicies": 589,
+  "iam:ListPoliciesGrantingServiceAccess": 590,
+  "iam:ListPolicyVersions": 591,
+  "iam:ListRolePolicies": 592,
+  "iam:ListRoleTags": 593,
+  "iam:ListRoles": 594,
+  "iam:ListSAMLProviders": 595,
+  "iam:ListSSHPublicKeys": 596,
+  "iam:ListServerCertificates": 597,
+  "iam:ListServiceSpecificCredentials": 598,
+  "iam:ListSigningCertificates": 599,
+  "iam:ListUserPolicies": 600,
+  "iam:ListUserTags": 601,
+  "iam:ListUsers": 602,
+  "iam:ListVirtualMFADevices": 603,
+  "iam:PassRole": 604,
+  "iam:PutGroupPolicy": 605,
+  "iam:PutRolePermissionsBoundary": 606,
+  "iam:PutRolePolicy": 607,
+  "iam:PutUserPermissionsBoundary": 608,
+  "iam:PutUserPolicy": 609,
+  "iam:RemoveClientIDFromOpenIDConnectProvider": 610,
+  "iam:RemoveRoleFromInstanceProfile": 611,
+  "iam:RemoveUserFromGroup": 612,
+  "iam:ResetServiceSpecificCredential": 613,
+  "iam:ResyncMFADevice": 614,
+  "iam:SetDefaultPolicyVersion": 615,
+  "iam:SetSecurityTokenServicePreferences": 616,
+  "iam:SimulateCustomPolicy": 617,
+  "iam:SimulatePrincipalPolicy": 618,
+  "iam:TagRole": 619,
+  "iam:TagUser": 620,
+  "iam:UntagRole": 621,
+  "iam:UntagUser": 622,
+  "iam:UpdateAccessKey": 623,
+  "iam:UpdateAccountPasswordPolicy": 624,
+  "iam:UpdateAssumeRolePolicy": 625,
+  "iam:UpdateGroup": 626,
+  "iam:UpdateLoginProfile": 627,
+  "iam:UpdateOpenIDConnectProviderThumbprint": 628,
+  "iam:UpdateRole": 629,
+  "iam:UpdateRoleDescription": 630,
+  "iam:UpdateSAMLProvider": 631,
+  "iam:UpdateSSHPublicKey": 632,
+  "iam:UpdateServerCertificate": 633,
+  "iam:UpdateServiceSpecificCredential": 634,
+  "iam:UpdateSigningCertificate": 635,
+  "iam:UpdateUser": 636,
+  "iam:UploadSSHPublicKey": 637,
+  "iam:UploadServerCertificate": 638,
+  "iam:UploadSigningCertificate": 639,
+  "lambda:AddLayerVersionPermission": 640,
+  "lambda:AddPermission": 641,
+  "lambda:CreateAlias": 642,
+  "lambda:CreateEventSourceMapping": 643,
+  "lambda:CreateFunction": 644,
+  "lambda:DeleteAlias": 645,
+  "lambda:DeleteEventSourceMapping": 646,
+  "lambda:DeleteFunction": 647,
+  "lambda:DeleteFunctionConcurrency": 648,
+  "lambda:DeleteLayerVersion": 649,
+  "lambda:EnableReplication": 650,
+  "lambda:GetAccountSettings": 651,
+  "lambda:GetAlias": 652,
+  "lambda:GetEventSourceMapping": 653,
+  "lambda:GetFunction": 654,
+  "lambda:GetFunctionConfiguration": 655,
+  "lambda:GetLayerVersion": 656,
+  "lambda:GetLayerVersionPolicy": 657,
+  "lambda:GetPolicy": 658,
+  "lambda:InvokeAsync": 659,
+  "lambda:InvokeFunction": 660,
+  "lambda:ListAliases": 661,
+  "lambda:ListEventSourceMappings": 662,
+  "lambda:ListFunctions": 663,
+  "lambda:ListLayerVersions": 664,
+  "lambda:ListLayers": 665,
+  "lambda:ListTags": 666,
+  "lambda:ListVersionsByFunction": 667,
+  "lambda:PublishLayerVersion": 668,
+  "lambda:PublishVersion": 669,
+  "lambda:PutFunctionConcurrency": 670,
+  "lambda:RemoveLayerVersionPermission": 671,
+  "lambda:RemovePermission": 672,
+  "lambda:TagResource": 673,
+  "lambda:UntagResource": 674,
+  "lambda:UpdateAlias": 675,
+  "lambda:UpdateEventSourceMapping": 676,
+  "lambda:UpdateFunctionCode": 677,
+  "lambda:UpdateFunctionConfiguration": 678,
+  "opsworks:AssignInstance": 679,
+  "opsworks:AssignVolume": 680,
+  "opsworks:AssociateElasticIp": 681,
+  "opsworks:AttachElasticLoadBalancer": 682,
+  "opsworks:CloneStack": 683,
+  "opsworks:CreateApp": 684,
+  "opsworks:CreateDeployment": 685,
+  "opsworks:CreateInstance": 686,
+  "opsworks:CreateLayer": 687,
+  "opsworks:CreateStack": 688,
+  "opsworks:CreateUserProfile": 689,
+  "opsworks:DeleteApp": 690,
+  "opsworks:DeleteInstance": 691,
+  "opsworks:DeleteLayer": 692,
+  "opsworks:DeleteStack": 693,
+  "opsworks:DeleteUserProfile": 694,
+  "opsworks:DeregisterEcsCluster": 695,
+  "opsworks:DeregisterElasticIp": 696,
+  "opsworks:DeregisterInstance": 697,
+  "opsworks:DeregisterRdsDbInstance": 698,
+  "opsworks:DeregisterVolume": 699,
+  "opsworks:DescribeAgentVersions": 700,
+  "opsworks:DescribeApps": 701,
+  "opsworks:DescribeCommands": 702,
+  "opsworks:DescribeDeployments": 703,
+  "opsworks:DescribeEcsClusters": 704,
+  "opsworks:DescribeElasticIps": 705,
+  "opsworks:DescribeElasticLoadBalancers": 706,
+  "opsworks:DescribeInstances": 707,
+  "opsworks:DescribeLayers": 708,
+  "opsworks:DescribeLoadBasedAutoScaling": 709,
+  "opsworks:DescribeMyUserProfile": 710,
+  "opsworks:DescribePermissions": 711,
+  "opsworks:DescribeRaidArrays": 712,
+  "opsworks:DescribeRdsDbInstances": 713,
+  "opsworks:DescribeServiceErrors": 714,
+  "opsworks:DescribeStackProvisioningParameters": 715,
+  "opsworks:DescribeStackSummary": 716,
+  "opsworks:DescribeStacks": 717,
+  "opsworks:DescribeTimeBasedAutoScaling": 718,
+  "opsworks:DescribeUserProfiles": 719,
+  "opsworks:DescribeVolumes": 720,
+  "opsworks:DetachElasticLoadBalancer": 721,
+  "opsworks:DisassociateElasticIp": 722,
+  "opsworks:GetHostnameSuggestion": 723,
+  "opsworks:GrantAccess": 724,
+  "opsworks:ListTags": 725,
+  "opsworks:RebootInstance": 726,
+  "opsworks:RegisterEcsCluster": 727,
+  "opsworks:RegisterElasticIp": 728,
+  "opsworks:RegisterInstance": 729,
+  "opsworks:RegisterRdsDbInstance": 730,
+  "opsworks:RegisterVolume": 731,
+  "opsworks:SetLoadBasedAutoScaling": 732,
+  "opsworks:SetPermission": 733,
+  "opsworks:SetTimeBasedAutoScaling": 734,
+  "opsworks:StartInstance": 735,
+  "opsworks:StartStack": 736,
+  "opsworks:StopInstance": 737,
+  "opsworks:StopStack": 738,
+  "opsworks:TagResource": 739,
+  "opsworks:UnassignInstance": 740,
+  "opsworks:UnassignVolume": 741,
+  "opsworks:UntagResource": 742,
+  "opsworks:UpdateApp": 743,
+  "opsworks:UpdateElasticIp": 744,
+  "opsworks:UpdateInstance": 745,
+  "opsworks:UpdateLayer": 746,
+  "opsworks:UpdateMyUserProfile": 747,
+  "opsworks:UpdateRdsDbInstance": 748,
+  "opsworks:UpdateStack": 749,
+  "opsworks:UpdateUserProfile": 750,
+  "opsworks:UpdateVolume": 751,
+  "s3:AbortMultipartUpload": 752,
+  "s3:CreateBucket": 753,
+  "s3:CreateJob": 754,
+  "s3:DeleteBucket": 755,
+  "s3:DeleteBucketPolicy": 756,
+  "s3:DeleteBucketWebsite": 757,
+  "s3:DeleteObject": 758,
+  "s3:DeleteObjectTagging": 759,
+  "s3:DeleteObjectVersion": 760,
+  "s3:DeleteObjectVersionTagging": 761,
+  "s3:DescribeJob": 762,
+  "s3:GetAccelerateConfiguration": 763,
+  "s3:GetAccountPublicAccessBlock": 764,
+  "s3:GetAnalyticsConfiguration": 765,
+  "s3:GetBucketAcl": 766,
+  "s3:GetBucketCORS": 767,
+  "s3:GetBucketLocation": 768,
+  "s3:GetBucketLogging": 769,
+  "s3:GetBucketNotification": 770,
+  "s3:GetBucketObjectLockConfiguration": 771,
+  "s3:GetBucketPolicy": 772,
+  "s3:GetBucketPolicyStatus": 773,
+  "s3:GetBucketPublicAccessBlock": 774,
+  "s3:GetBucketRequestPayment": 775,
+  "s3:GetBucketTagging": 776,
+  "s3:GetBucketVersioning": 777,
+  "s3:GetBucketWebsite": 778,
+  "s3:GetEncryptionConfiguration": 779,
+  "s3:GetInventoryConfiguration": 780,
+  "s3:GetLifecycleConfiguration": 781,
+  "s3:GetMetricsConfiguration": 782,
+  "s3:GetObject": 783,
+  "s3:GetObjectAcl": 784,
+  "s3:GetObjectLegalHold": 785,
+  "s3:GetObjectRetention": 786,
+  "s3:GetObjectTagging": 787,
+  "s3:GetObjectTorrent": 788,
+  "s3:GetObjectVersion": 789,
+  "s3:GetObjectVersionAcl": 790,
+  "s3:GetObjectVersionForReplication": 791,
+  "s3:GetObjectVersionTagging": 792,
+  "s3:GetObjectVersionTorrent": 793,
+  "s3:GetReplicationConfiguration": 794,
+  "s3:ListAllMyBuckets": 795,
+  "s3:ListBucket": 796,
+  "s3:ListBucketByTags": 797,
+  "s3:ListBucketMultipartUploads": 798,
+  "s3:ListBucketVersions": 799,
+  "s3:ListJobs": 800,
+  "s3:ListMultipartUploadParts": 801,
+  "s3:ObjectOwnerOverrideToBucketOwner": 802,
+  "s3:PutAccelerateConfiguration": 803,
+  "s3:PutAccountPublicAccessBlock": 804,
+  "s3:PutAnalyticsConfiguration": 805,
+  "s3:PutBucketAcl": 806,
+  "s3:PutBucketCORS": 807,
+  "s3:PutBucketLogging": 808,
+  "s3:PutBucketNotification": 809,
+  "s3:PutBucketObjectLockConfiguration": 810,
+  "s3:PutBucketPolicy": 811,
+  "s3:PutBucketPublicAccessBlock": 812,
+  "s3:PutBucketRequestPayment": 813,
+  "s3:PutBucketTagging": 814,
+  "s3:PutBucketVersioning": 815,
+  "s3:PutBucketWebsite": 816,
+  "s3:PutEncryptionConfiguration": 817,
+  "s3:PutInventoryConfiguration": 818,
+  "s3:PutLifecycleConfiguration": 819,
+  "s3:PutMetricsConfiguration": 820,
+  "s3:PutObject": 821,
+  "s3:PutObjectAcl": 822,
+  "s3:PutObjectLegalHold": 823,
+  "s3:PutObjectRetention": 824,
+  "s3:PutObjectTagging": 825,
+  "s3:PutObjectVersionAcl": 826,
+  "s3:PutObjectVersionTagging": 827,
+  "s3:PutReplicationConfiguration": 828,
+  "s3:ReplicateDelete": 829,
+  "s3:ReplicateObject": 830,
+  "s3:ReplicateTags": 831,
+  "s3:RestoreObject": 832,
+  "s3:UpdateJobPriority": 833,
+  "s3:UpdateJobStatus": 834,
+  "sns:AddPermission": 835,
+  "sns:CheckIfPhoneNumberIsOptedOut": 836,
+  "sns:ConfirmSubscription": 837,
+  "sns:CreatePlatformApplication": 838,
+  "sns:CreatePlatformEndpoint": 839,
+  "sns:CreateTopic": 840,
+  "sns:DeleteEndpoint": 841,
+  "sns:DeletePlatformApplication": 842,
+  "sns:DeleteTopic": 843,
+  "sns:GetEndpointAttributes": 844,
+  "sns:GetPlatformApplicationAttributes": 845,
+  "sns:GetSMSAttributes": 846,
+  "sns:GetSubscriptionAttributes": 847,
+  "sns:GetTopicAttributes": 848,
+  "sns:ListEndpointsByPlatformApplication": 849,
+  "sns:ListPhoneNumbersOptedOut": 850,
+  "sns:ListPlatformApplications": 851,
+  "sns:ListSubscriptions": 852,
+  "sns:ListSubscriptionsByTopic": 853,
+  "sns:ListTagsForResource": 854,
+  "sns:ListTopics": 855,
+  "sns:OptInPhoneNumber": 856,
+  "sns:Publish": 857,
+  "sns:RemovePermission": 858,
+  "sns:SetEndpointAttributes": 859,
+  "sns:SetPlatformApplicationAttributes": 860,
+  "sns:SetSubscriptionAttributes": 861,
+  "sns:SetTopicAttributes": 862,
+  "sns:Subscribe": 863,
+  "sns:TagResource": 864,
+  "sns:Unsubscribe": 865,
+  "sns:UntagResource": 866,
+  "sts:AssumeRole": 867,
+  "sts:AssumeRoleWithSAML": 868,
+  "sts:AssumeRoleWithWebIdentity": 869,
+  "sts:DecodeAuthorizationMessage": 870,
+  "sts:GetAccessKeyInfo": 871,
+  "sts:GetCallerIdentity": 872,
+  "sts:GetFederationToken": 873,
+  "sts:GetSessionToken": 874
+}
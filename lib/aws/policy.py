@@ -1,27 +1,238 @@
 
+import hashlib
 import json
 import re
+from bisect import bisect_left, insort
 from functools import reduce
 
 from lib.aws.actions import ACTIONS
 from lib.aws.resources import RESOURCES
 
 from lib.graph.base import Element, Elements
-from lib.graph.edges import Action, Trusts
+from lib.graph.edges import Action, Grant, Trusts
 from lib.graph.nodes import Resource, External
 
 
+''' Compiled patterns and wildcard action expansions, shared by all Statements '''
+
+
+class Patterns:
+
+    # Regular expressions are compiled once per pattern string, and action
+    # wildcards (e.g. 'iam:Put*') are expanded by walking a prefix trie over
+    # ACTIONS, rather than matching a regex against every known action.
+    # Expansions are cached, so repeated (e.g. managed) policy documents
+    # reuse them.
+
+    _regex = {}
+    _expansions = {}
+    _statements = {}
+    _trie = None
+
+    @staticmethod
+    def compile(pattern):
+
+        if pattern not in Patterns._regex:
+            Patterns._regex[pattern] = re.compile(pattern)
+
+        return Patterns._regex[pattern]
+
+    @staticmethod
+    def _actions_trie():
+
+        # Each node maps a character to its child, and None to the (sorted)
+        # list of actions sharing that node's prefix.
+
+        if Patterns._trie is None:
+
+            Patterns._trie = {None: []}
+
+            for action in sorted(ACTIONS.keys()):
+
+                node = Patterns._trie
+                node[None].append(action)
+
+                for c in action:
+                    node = node.setdefault(c, {None: []})
+                    node[None].append(action)
+
+        return Patterns._trie
+
+    @staticmethod
+    def expand(action):
+
+        if '*' not in action:
+            return [action] if action in ACTIONS else []
+
+        if action in Patterns._expansions:
+            return Patterns._expansions[action]
+
+        prefix = action.split('*')[0]
+        node = Patterns._actions_trie()
+
+        for c in prefix:
+            if c not in node:
+                node = {None: []}
+                break
+            node = node[c]
+
+        if action == prefix + '*':
+            expansion = list(node[None])
+        else:
+            regex = Patterns.compile(action.replace("*", "(.*)"))
+            expansion = [a for a in node[None] if regex.match(a)]
+
+        Patterns._expansions[action] = expansion
+
+        return expansion
+
+
+''' Index of element ARNs, used to resolve Resource patterns '''
+
+
+class ArnIndex:
+
+    # ARNs are split into partition, service, region, and account segments,
+    # which form a trie, the leaves of which hold the resource segments of
+    # matching elements (sorted, so that they can be searched by prefix).
+    # Looking up a pattern only descends through literal segments: wildcards
+    # and policy variables (${aws:username}) can span segments, so the
+    # elements returned are candidates, which must still be matched against
+    # the pattern's regex. Candidates are returned in the order in which they
+    # were added.
+
+    segments = 6
+    metacharacters = set(".^$*+?{}[]\\|()")
+
+    def __init__(self, elements):
+
+        self._trie = {}
+        self._other = []
+        self._count = 0
+
+        for element in elements:
+            self._add(element, append=True)
+
+        for leaf in self._leaves(self._trie):
+            leaf.sort()
+
+    @staticmethod
+    def of(elements):
+
+        # One index is shared by every policy resolved against the same
+        # collection, until it changes (see Elements.views).
+
+        if ArnIndex not in elements.views:
+            elements.views[ArnIndex] = ArnIndex(elements)
+
+        return elements.views[ArnIndex]
+
+    def _leaves(self, node, depth=0):
+
+        if depth == self.segments - 2:
+            return [node]
+
+        return [leaf for child in node.values()
+                for leaf in self._leaves(child, depth + 1)]
+
+    def _literal(self, segment):
+
+        return not any([c in self.metacharacters for c in segment])
+
+    def add(self, element):
+        self._add(element)
+
+    def _add(self, element, append=False):
+
+        arn = str(element.id()).split(':', self.segments - 1)
+        self._count += 1
+
+        if len(arn) != self.segments or arn[0] != "arn":
+            self._other.append((self._count, element))
+            return
+
+        node = self._trie
+        for segment in arn[1:-2]:
+            node = node.setdefault(segment, {})
+
+        leaf = node.setdefault(arn[-2], [])
+        entry = (arn[-1], self._count, element)
+
+        # Leaves are sorted once they have all been added, otherwise
+        # they are kept sorted as elements are added
+
+        if append:
+            leaf.append(entry)
+        else:
+            insort(leaf, entry)
+
+    def lookup(self, pattern):
+
+        pattern = pattern.split(':', self.segments - 1)
+        nodes = [self._trie]
+        aligned = pattern[0] == "arn"
+
+        # Descend through literal partition, service, region, and account
+        # segments. Once a segment includes a wildcard (or the pattern runs
+        # out of segments), the remaining segments are no longer aligned
+        # and every branch must be considered.
+
+        for depth in range(1, self.segments - 1):
+
+            aligned = aligned and depth < len(pattern) - 1 \
+                and self._literal(pattern[depth])
+
+            if aligned:
+                nodes = [n[pattern[depth]] for n in nodes
+                         if pattern[depth] in n]
+            else:
+                nodes = [c for n in nodes for c in n.values()]
+
+        # Narrow resource segments by their literal prefix
+
+        prefix = ""
+        if aligned and len(pattern) == self.segments:
+            for c in pattern[-1]:
+                if c in self.metacharacters:
+                    break
+                prefix += c
+
+        candidates = list(self._other)
+        for leaf in nodes:
+            i = bisect_left(leaf, (prefix,))
+            while i < len(leaf) and leaf[i][0].startswith(prefix):
+                candidates.append(leaf[i][1:])
+                i += 1
+
+        return [e for _, e in sorted(candidates, key=lambda x: x[0])]
+
+
 ''' Consists of Principals, Actions, Resources, and Conditions '''
 
 
 class Statement:
 
-    def __init__(self, statement: dict, resource: Element, resources: Elements):
+    # When set, statements granting actions on all resources ("Resource": "*",
+    # or a pattern that matches any ARN, e.g. "arn:aws:*") resolve to one
+    # Grant per action pattern and principal, to a node representing all
+    # resources, rather than to an Action for every action and affected
+    # resource. Grants are expanded when attacks are computed.
+
+    collapse = False
+
+    # Resolved statements (see _matches), and how often they were reused
+
+    _cache = {}
+    hits = 0
+    lookups = 0
+
+    def __init__(self, statement: dict, resource: Element, resources: Elements, index: ArnIndex = None):
 
         # TODO: policy statements do not appear to strictly adhere to the JSON
         # format and may include duplicate keys. Duplicate keys will be ignored.
 
         self._resources = resources
+        self._index = index
         self._statement = statement
         self._resource = resource
 
@@ -30,7 +241,6 @@ class Statement:
         self._explicit_resources = None
         self._explicit_conditions = None
         self._explicit_resource_conditions = {}
-        self._Actions = None
 
         try:
 
@@ -91,28 +301,32 @@ class Statement:
 
         if "AWS" in statement:
 
+            # The statement is left as it was ingested, principals may be
+            # resolved by another process (see IAM._resolve_shards)
+
             if not isinstance(statement["AWS"], list):
-                statement["AWS"] = [statement["AWS"]]
+                statement = {**statement, "AWS": [statement["AWS"]]}
+
+            # Any AWS principal is represented by a single node, rather than
+            # by every user and role: these are made members of it instead
+            # (see IAM.resolve).
 
             if '*' in statement["AWS"]:
 
-                principals = self._resources.get(
-                    'AWS::Iam::User').get("Resource") + self._resources.get(
-                    'AWS::Iam::Role').get("Resource") + [External(
-                        key="Arn",
-                        labels=["AWS::Account"],
-                        properties={
-                            "Name": "All AWS Accounts",
-                            "Arn": "arn:aws:iam::{Account}:root"
-                        })]
+                principals = Elements([External(
+                    key="Arn",
+                    labels=["AWS::Account"],
+                    properties={
+                        "Name": "All AWS Accounts",
+                        "Arn": "arn:aws:iam::{Account}:root"
+                    })])
 
             for principal in [p for p in statement["AWS"] if '*' not in statement["AWS"]]:
 
                 if '*' in principal:
                     continue
 
-                node = next((a for a in self._resources
-                             if a.id() == principal), None)
+                node = self._resources.find(principal)
 
                 # We haven't seen this node before. It may belong to another account,
                 # or it belongs to a service that was not loaded.
@@ -239,15 +453,18 @@ class Statement:
             if isinstance(self._statement[key], list) \
             else [self._statement[key]]
 
-        for action in [a for a in statement if '*' not in statement]:
+        # Statements listing the same actions resolve to the same result
 
-            if '*' in action:
+        cache = (key, tuple(statement)) \
+            if all([isinstance(a, str) for a in statement]) \
+            else None
 
-                actions.update(set(filter(re.compile(
-                    action.replace("*", "(.*)")).match,
-                    ACTIONS.keys())))
-            else:
-                actions.update([action] if action in ACTIONS.keys() else [])
+        if cache in Patterns._statements:
+            self._explicit_actions = Patterns._statements[cache]
+            return
+
+        for action in [a for a in statement if '*' not in statement]:
+            actions.update(Patterns.expand(action))
 
         if '*' in statement and key != 'NotAction':
             actions = set(ACTIONS.keys())
@@ -262,6 +479,9 @@ class Statement:
 
         self._explicit_actions = sorted(list(actions))
 
+        if cache is not None:
+            Patterns._statements[cache] = self._explicit_actions
+
     def _resolve_resource_statement(self):
 
         resources = Elements()
@@ -273,19 +493,24 @@ class Statement:
             if isinstance(self._statement[key], list) \
             else [self._statement[key]]
 
-        for resource in set([r.replace('*', "(.*)") + "$" for r in statement
-                             if '*' not in statement
-                             and len(self._resources) > 0]):
+        patterns = {r.replace('*', "(.*)") + "$": r for r in statement
+                    if '*' not in statement
+                    and len(self._resources) > 0}
+
+        if len(patterns) > 0 and self._index is None:
+            self._index = ArnIndex.of(self._resources)
+
+        for resource, pattern in patterns.items():
 
             # Identify variable resource-level permissions
             variables = list(re.findall("\$\{[0-9a-zA-Z:]+\}", resource))
-            regex = re.compile(reduce(lambda x, y: x.replace(y, "(.*)"),
-                                      variables,
-                                      resource))
+            regex = Patterns.compile(reduce(lambda x, y: x.replace(y, "(.*)"),
+                                            variables,
+                                            resource))
 
-            # Match resource-level permissions against resource arns
+            # Match resource-level permissions against candidate resource arns
             results = Elements(filter(lambda r: regex.match(r.id()),
-                                      self._resources))
+                                      self._index.lookup(pattern)))
 
             # Standard case: add results to result set
             if len(variables) == 0:
@@ -360,18 +585,58 @@ class Statement:
         return [str(r) for r in self._explicit_resources]
 
     def resolve(self):
+        return Elements(self.stream())
 
-        if self._Actions is not None:
-            return self._Actions
+    def stream(self):
+
+        # Actions are generated as they are resolved, rather than collected
+        # (see Policy.resolve)
+
+        if self._explicit_principals is None:
+            self._resolve_principal_statement()
+
+        if self._collapsible():
+            yield from self._grants()
+            return
+
+        for (action, resource, condition) in self._matches():
+            for principal in self._explicit_principals:
+                yield Action(
+                    properties={
+                        "Name":         action,
+                        "Description":  ACTIONS[action]["Description"],
+                        "Effect":       self._statement["Effect"],
+                        "Access":       ACTIONS[action]["Access"],
+                        "Reference":    ACTIONS[action]["Reference"],
+                        "Condition":    condition
+                    },
+                    source=principal, target=resource)
+
+    def _matches(self):
+
+        # The (action, resource, condition) triples this statement applies
+        # to. These do not depend on its principals or effect, so statements
+        # that are otherwise identical (e.g. a document attached to many
+        # principals) share them: they are cached, by a hash of the
+        # statement, until the cache is cleared (see IAM.resolve).
+
+        key = hashlib.md5(json.dumps(
+            {k: v for k, v in self._statement.items()
+             if k not in ["Sid", "Effect", "Principal", "NotPrincipal"]},
+            sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+        Statement.lookups += 1
+
+        if key in Statement._cache:
+            Statement.hits += 1
+            return Statement._cache[key]
 
         if self._explicit_actions is None:
             self._resolve_action_statement()
         if self._explicit_resources is None:
             self._resolve_resource_statement()
-        if self._explicit_principals is None:
-            self._resolve_principal_statement()
 
-        actions = Elements()
+        matches = []
 
         for action in self.actions():
 
@@ -397,25 +662,77 @@ class Statement:
                 condition = json.dumps(condition) \
                     if len(condition[0]) > 0 else "[]"
 
-                for principal in self._explicit_principals:
-                    actions.append(Action(
-                        properties={
-                            "Name":         action,
-                            "Description":  ACTIONS[action]["Description"],
-                            "Effect":       self._statement["Effect"],
-                            "Access":       ACTIONS[action]["Access"],
-                            "Reference":    ACTIONS[action]["Reference"],
-                            "Condition":    condition
-                        },
-                        source=principal, target=resource))
+                matches.append((action, resource, condition))
+
+        Statement._cache[key] = matches
+
+        return matches
+
+    def _collapsible(self):
+
+        if not Statement.collapse or "Action" not in self._statement:
+            return False
+
+        resources = self._statement.get("Resource")
+        resources = resources if isinstance(resources, list) else [resources]
+
+        return any([Statement._universal(r) for r in resources])
+
+    @staticmethod
+    def _universal(pattern):
+
+        # Whether pattern matches every ARN. Wildcards match across colons,
+        # so any pattern of wildcard segments that an ARN's (at least) six
+        # segments can fill does, e.g. "arn:*" or "arn:aws:*:*:*:*".
+
+        if not isinstance(pattern, str):
+            return False
+
+        if pattern == "*":
+            return True
+
+        segments = pattern.split(':')
+
+        return segments[0] == "arn" \
+            and 2 <= len(segments) <= 6 \
+            and segments[1] in ["aws", "*"] \
+            and all([s == "*" for s in segments[2:]]) \
+            and segments[-1] == "*"
+
+    def _grants(self):
 
-        # Unset resource level permission conditions
-        for resource in self._explicit_resources:
-            resource.condition = []
+        patterns = self._statement["Action"] \
+            if isinstance(self._statement["Action"], list) \
+            else [self._statement["Action"]]
 
-        self._Actions = actions
+        condition = json.dumps([self._explicit_conditions]) \
+            if len(self._explicit_conditions) > 0 else "[]"
 
-        return self._Actions
+        everything = External(
+            key="Arn",
+            labels=["AWS::All"],
+            properties={
+                "Name": "All Resources",
+                "Arn": "*"
+            })
+
+        for pattern in sorted(set([p for p in patterns if isinstance(p, str)])):
+
+            # Patterns that match no known action (e.g. malformed ones) are
+            # dropped, as they would be otherwise
+
+            if len(Patterns.expand(pattern)) == 0:
+                continue
+
+            for principal in self._explicit_principals:
+                yield Grant(
+                    properties={
+                        "Name":         pattern,
+                        "Description":  f"Grants action(s) matching '{pattern}' on all resources",
+                        "Effect":       self._statement["Effect"],
+                        "Condition":    condition
+                    },
+                    source=principal, target=everything)
 
 
 ''' Consists of one or more Statements '''
@@ -423,7 +740,7 @@ class Statement:
 
 class Document:
 
-    def __init__(self, document, resource, resources):
+    def __init__(self, document, resource, resources, index=None):
 
         self.document = {}
         self.statements = []
@@ -450,7 +767,8 @@ class Document:
             self.statements.append(Statement(
                 statement=statement,
                 resource=self.resource,
-                resources=resources))
+                resources=resources,
+                index=index))
 
     def __str__(self):
         return self._document
@@ -465,13 +783,15 @@ class Document:
                                if p not in principals])
         return principals
 
-    def resolve(self):
-        actions = Elements()
+    def resolve(self, actions=None):
+        actions = Elements() if actions is None else actions
+        actions.extend(r for r in self.stream() if r not in actions)
+        return actions
+
+    def stream(self):
         for i in range(len(self.statements)):
-            results = self.statements[i].resolve()
             # [r.set("Statement", i) for r in results]
-            actions.extend(r for r in results if r not in actions)
-        return actions
+            yield from self.statements[i].stream()
 
 
 ''' Consists of one or more Documents '''
@@ -479,11 +799,12 @@ class Document:
 
 class Policy:
 
-    def __init__(self, resource, resources):
+    def __init__(self, resource, resources, index=None):
 
         self.documents = {}
         self.resource = resource
         self.resources = resources
+        self.index = index
 
     def __str__(self):
 
@@ -495,14 +816,21 @@ class Policy:
     def __len__(self):
         return len(self.documents)
 
-    def resolve(self):
+    def resolve(self, actions=None):
+
+        # Actions are added to `actions`, if it is given, unless they are
+        # already a part of it. Only one statement's actions are generated
+        # at a time, rather than collected for every statement, document and
+        # policy in turn.
 
-        actions = Elements()
+        actions = Elements() if actions is None else actions
+        actions.extend(r for r in self.stream() if r not in actions)
+        return actions
+
+    def stream(self):
         for _, policy in self.documents.items():
-            results = policy.resolve()
             # [r.set("Policy", name) for r in results]
-            actions.extend([r for r in results if r not in actions])
-        return actions
+            yield from policy.stream()
 
 
 ''' Inline and Managed Policies associated with IAM entities '''
@@ -510,9 +838,9 @@ class Policy:
 
 class IdentityBasedPolicy(Policy):
 
-    def __init__(self, resource, resources):
+    def __init__(self, resource, resources, index=None):
 
-        super().__init__(resource, resources)
+        super().__init__(resource, resources, index)
         key = list(filter(lambda k: k == "Document" or k == "Documents",
                           self.resource.properties().keys()))
 
@@ -521,7 +849,8 @@ class IdentityBasedPolicy(Policy):
 
         for policy in self.resource.properties()[key[0]]:
             for name, document in policy.items():
-                self.documents[name] = Document(document, resource, resources)
+                self.documents[name] = Document(
+                    document, resource, resources, index)
 
 
 ''' Policies that define actions permitted to be performed on the associated resource. '''
@@ -531,18 +860,18 @@ class ResourceBasedPolicy(Policy):
 
     # https://docs.aws.amazon.com/IAM/latest/UserGuide/reference_aws-services-that-work-with-iam.html
 
-    def __init__(self, resource, resources, keys=[]):
+    def __init__(self, resource, resources, keys=[], index=None):
 
-        super().__init__(resource, resources)
+        super().__init__(resource, resources, index)
 
         for k, v in resource.properties().items():
 
             if len(keys) == 0 or k in keys:
-                document = Document(v, resource, resources)
+                document = Document(v, resource, resources, index)
 
                 if len(document) > 0:
                     self.documents[k] = Document(
-                        resource.properties()[k], resource, resources)
+                        resource.properties()[k], resource, resources, index)
 
     def principals(self):
 
@@ -586,7 +915,7 @@ class BucketACL(ResourceBasedPolicy):
         ],
     }
 
-    def __init__(self, resource, resources):
+    def __init__(self, resource, resources, index=None):
 
         statements = []
 
@@ -656,7 +985,7 @@ class BucketACL(ResourceBasedPolicy):
                 "Statement": statements
             }
 
-        super().__init__(resource, resources, keys=["_"])
+        super().__init__(resource, resources, keys=["_"], index=index)
 
         if "_" in resource.properties():
             del resource.properties()["_"]
@@ -0,0 +1,216 @@
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+
+class Bucket:
+
+    # Token bucket with an adaptive rate: the rate is halved whenever a
+    # request is throttled, and recovers additively with every request that
+    # is not (AIMD).
+
+    def __init__(self, rate, burst, minimum, maximum):
+
+        self.rate = rate
+        self.burst = burst
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+
+        with self.lock:
+
+            now = time.monotonic()
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            # Tokens may go negative, in which case this request has reserved
+            # the next token and must wait for it.
+
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttled(self):
+
+        with self.lock:
+            self.rate = max(self.minimum, self.rate / 2)
+
+    def succeeded(self):
+
+        with self.lock:
+            self.rate = min(self.maximum, self.rate + 0.5)
+
+
+class Scheduler:
+
+    # Central rate limiter and retry scheduler for AWS API requests. Every
+    # (service, region) pair is given its own token bucket. Sessions are
+    # attached to the scheduler, which hooks into botocore's event system to
+    # acquire a token before every API call, and to adapt the bucket's rate
+    # to throttling responses. Operations that are still throttled once
+    # botocore has exhausted its own retries can be retried with call().
+
+    rate = 20.0
+    burst = 20
+    minimum = 1.0
+    maximum = 200.0
+
+    retries = 6
+    backoff = 0.5
+    cap = 30.0
+
+    codes = [
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottled",
+        "RequestThrottledException",
+        "RequestLimitExceeded",
+        "TooManyRequestsException",
+        "SlowDown",
+        "PriorRequestNotComplete",
+        "ProvisionedThroughputExceededException",
+        "BandwidthLimitExceeded",
+    ]
+
+    _buckets = {}
+    _counters = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(service, region):
+
+        with Scheduler._lock:
+
+            if (service, region) not in Scheduler._buckets:
+                Scheduler._buckets[(service, region)] = Bucket(
+                    Scheduler.rate, Scheduler.burst,
+                    Scheduler.minimum, Scheduler.maximum)
+
+            return Scheduler._buckets[(service, region)]
+
+    @staticmethod
+    def count(service, region, counter):
+
+        with Scheduler._lock:
+
+            if (service, region) not in Scheduler._counters:
+                Scheduler._counters[(service, region)] = {
+                    "Requests": 0,
+                    "Throttled": 0,
+                    "Retried": 0,
+                    "Failed": 0
+                }
+
+            Scheduler._counters[(service, region)][counter] += 1
+
+    @staticmethod
+    def key(service_model, region):
+
+        # Buckets and counters are keyed by botocore's service id and the
+        # client's region, which both the event hooks and call() can see.
+        # Ingestor names and session regions differ from these for some
+        # services (e.g. IAM's global endpoint).
+
+        return (service_model.service_id, region)
+
+    @staticmethod
+    def throttling(error):
+
+        return isinstance(error, ClientError) \
+            and error.response.get("Error", {}).get("Code") in Scheduler.codes
+
+    @staticmethod
+    def attach(session):
+
+        # Handlers are registered with a unique id, so attaching the same
+        # session more than once has no effect.
+
+        session.events.register("before-call", Scheduler._before_call,
+                                unique_id="awspx-scheduler-before-call")
+        session.events.register("needs-retry", Scheduler._needs_retry,
+                                unique_id="awspx-scheduler-needs-retry")
+
+        return session
+
+    @staticmethod
+    def _before_call(event_name=None, model=None, context={}, **kwargs):
+
+        (service, region) = Scheduler.key(model.service_model,
+                                          context.get("client_region"))
+
+        Scheduler.count(service, region, "Requests")
+        Scheduler._bucket(service, region).acquire()
+
+    @staticmethod
+    def _needs_retry(event_name=None, response=None, operation=None,
+                     request_dict={}, **kwargs):
+
+        # Observe every attempt, botocore decides whether to retry it.
+
+        if response is None:
+            return
+
+        (service, region) = Scheduler.key(
+            operation.service_model,
+            request_dict.get("context", {}).get("client_region"))
+        code = response[1].get("Error", {}).get("Code") \
+            if isinstance(response[1], dict) else None
+
+        if code in Scheduler.codes:
+            Scheduler.count(service, region, "Throttled")
+            Scheduler._bucket(service, region).throttled()
+        else:
+            Scheduler._bucket(service, region).succeeded()
+
+    @staticmethod
+    def call(client, function, *args, **kwargs):
+
+        # Retry throttled operations (made through client) using exponential
+        # backoff with full jitter. Any other error is raised immediately.
+
+        (service, region) = Scheduler.key(client.meta.service_model,
+                                          client.meta.region_name)
+
+        for attempt in range(Scheduler.retries + 1):
+
+            try:
+                return function(*args, **kwargs)
+
+            except ClientError as e:
+
+                if not Scheduler.throttling(e):
+                    raise
+
+                if attempt == Scheduler.retries:
+                    Scheduler.count(service, region, "Failed")
+                    raise
+
+                Scheduler.count(service, region, "Retried")
+                Scheduler._bucket(service, region).throttled()
+
+                time.sleep(random.uniform(0, min(
+                    Scheduler.cap, Scheduler.backoff * 2 ** attempt)))
+
+    @staticmethod
+    def report():
+
+        if len(Scheduler._counters) == 0:
+            return
+
+        print("[+] API requests (throttled, retried, failed):")
+
+        for (service, region), c in sorted(Scheduler._counters.items(),
+                                           key=lambda x: (str(x[0][0]), str(x[0][1]))):
+            print(f" \\-> {service} ({region or 'global'}): {c['Requests']} "
+                  f"({c['Throttled']}, {c['Retried']}, {c['Failed']}), "
+                  f"settled at {Scheduler._bucket(service, region).rate:.1f} request(s)/s")
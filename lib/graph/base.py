@@ -1,10 +1,12 @@
 
 import csv
 import hashlib
+import io
 import json
 import os
-import subprocess
-import shutil
+import sys
+import threading
+import zipfile
 from datetime import datetime
 
 from lib.aws.actions import ACTIONS
@@ -13,8 +15,101 @@ from lib.aws.resources import RESOURCES
 from lib.graph.db import Neo4j
 
 
+class Codec:
+
+    # Decodes property values. Strings are only parsed as JSON, or as
+    # timestamps, if their shape allows for it, so that plain strings never
+    # pay for a failed parse. The kind of value last decoded for each
+    # (labels, key) pair is remembered, and tried first.
+
+    prefixes = '{["-0123456789tfnNI'
+    literals = ["true", "false", "null", "NaN", "Infinity"]
+    whitespace = " \t\n\r"
+
+    _schema = {}
+
+    @staticmethod
+    def decode(v, schema=None):
+
+        if isinstance(v, (datetime, dict, list, int)):
+            return v
+
+        if not isinstance(v, str):
+            return Codec.parse(v)
+
+        if Codec._schema.get(schema) == "datetime":
+            timestamp = Codec.timestamp(v)
+            if timestamp is not None:
+                return timestamp
+
+        s = v.lstrip(Codec.whitespace)
+
+        if s != "" and s[0] in Codec.prefixes and \
+                (s[0] not in "tfnNI" or s.rstrip(Codec.whitespace) in Codec.literals):
+            try:
+                value = json.loads(v)
+                Codec._schema[schema] = "json"
+                return value
+            except json.decoder.JSONDecodeError:
+                pass
+
+        timestamp = Codec.timestamp(v)
+        if timestamp is not None:
+            Codec._schema[schema] = "datetime"
+            return timestamp
+
+        Codec._schema[schema] = "str"
+        return str(v)
+
+    @staticmethod
+    def timestamp(v):
+
+        # Equivalent to strptime(v[:-6], '%Y-%m-%d %H:%M:%S'), which requires
+        # at least 20 characters beginning with a four digit year.
+
+        if len(v) < 20 or not v[:4].isdigit() or v[4] != '-':
+            return None
+
+        try:
+            if len(v) == 25 and v[7] == '-' and v[10] == ' ' \
+                    and v[13] == ':' and v[16] == ':' \
+                    and (v[5:7] + v[8:10] + v[11:13] + v[14:16] + v[17:19]).isdigit():
+                return datetime(int(v[:4]), int(v[5:7]), int(v[8:10]),
+                                int(v[11:13]), int(v[14:16]), int(v[17:19]))
+
+            return datetime.strptime(v[:-6], '%Y-%m-%d %H:%M:%S')
+
+        except ValueError:
+            return None
+
+    @staticmethod
+    def parse(v):
+
+        try:
+            return json.loads(v)
+        except json.decoder.JSONDecodeError:
+            pass
+
+        try:
+            return datetime.strptime(v[:-6], '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            pass
+
+        return str(v)
+
+
 class Element:
 
+    __slots__ = ["_properties", "_pending", "_labels", "_key"]
+
+    # Elements with the same labels share one (sorted, interned) tuple of
+    # them, and edges with the same properties share one property record.
+
+    _labelsets = {}
+    _records = {}
+    _raw_records = {}
+    _lock = threading.Lock()
+
     def __init__(self, properties={}, labels=[], key="Name"):
 
         if not isinstance(properties, dict):
@@ -26,41 +121,43 @@ class Element:
         if key not in properties:
             raise ValueError("Missing key: '%s'" % key)
 
-        self._properties = {}
+        self._labels = Element._labelset(labels)
+        self._key = sys.intern(key)
 
-        for k, v in properties.items():
+        # Only the key is decoded up front, everything else is decoded on
+        # first access (see properties)
 
-            if any([isinstance(v, t) for t in [datetime, dict, list, int]]):
-                self._properties[k] = v
-                continue
+        value = Codec.decode(properties[key], (self._labels, key))
 
-            elif type(v) is None:
-                self._properties[k] = ""
-                continue
+        self._properties = {self._key: sys.intern(value)
+                            if isinstance(value, str) else value}
+        self._pending = dict(properties) if len(properties) > 1 else None
 
-            try:
-                self._properties[k] = json.loads(v)
-                continue
-            except json.decoder.JSONDecodeError:
-                pass
+    @staticmethod
+    def _labelset(labels):
 
-            try:
-                self._properties[k] = datetime.strptime(
-                    v[:-6], '%Y-%m-%d %H:%M:%S')
-                continue
-            except ValueError:
-                pass
+        labelset = tuple(labels)
 
-            self._properties[k] = str(v)
+        if labelset not in Element._labelsets:
+            Element._labelsets[labelset] = tuple(sorted(set(
+                [sys.intern(str(l)) for l in labels])))
 
-        self._labels = set(labels)
-        self._key = key
+        return Element._labelsets[labelset]
 
     def properties(self):
+
+        if self._pending is not None:
+
+            self._properties = {
+                k: self._properties[k] if k == self._key
+                else Codec.decode(v, (self._labels, k))
+                for k, v in self._pending.items()}
+            self._pending = None
+
         return self._properties
 
     def labels(self):
-        return sorted(list(self._labels))
+        return list(self._labels)
 
     def type(self, label):
         return label in self._labels
@@ -68,16 +165,34 @@ class Element:
     def id(self):
         return self._properties[self._key]
 
+    def key(self):
+        return self.id()
+
     def get(self, k):
-        return self._properties[k]
+        return self.properties()[k]
 
     def set(self, k, v):
-        self._properties[k] = v
+        self.properties()[k] = v
+
+    def export(self):
+
+        # Properties as they are stored in Neo4j
+
+        return {k: json.dumps(v, default=str) if isinstance(v, (list, dict)) else str(v)
+                for k, v in self.properties().items()}
+
+    def digest(self):
+        return hashlib.md5(json.dumps(
+            [self.labels(), self.properties()],
+            sort_keys=True, default=str).encode('utf-8')).hexdigest()
 
     def __eq__(self, other):
         if isinstance(other, str):
-            return other in self.labels()
-        return self.id() == other.id()
+            return other in self._labels
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
 
     def __lt__(self, other):
         return self.id() < other.id()
@@ -93,12 +208,17 @@ class Element:
 
 
 class Node(Element):
+
+    __slots__ = []
+
     def __init__(self, properties={}, labels=[], key="Name"):
         super().__init__(properties, labels, key)
 
 
 class Edge(Element):
 
+    __slots__ = ["_source", "_target", "_id", "_identity", "_hash"]
+
     def __init__(self, properties={}, source=None, target=None, label=None):
 
         if label is None:
@@ -108,16 +228,58 @@ class Edge(Element):
 
         self._source = source
         self._target = target
-        self._set_id()
+        self._set_record()
+
+    def _set_record(self):
 
-    def _set_id(self):
+        # Edges with the same properties share a (numbered) property record,
+        # which must not be modified in place (see set). An edge is
+        # identified by its source, label, record, and target (see key).
+        # The md5 id is only computed when it is asked for, i.e. on export.
 
-        self._id = hashlib.md5(("({source})-[:{label}{{{properties}}}]->({target})".format(
-            source=self.source(),
-            label=self.labels()[0],
-            properties=json.dumps(self.properties(), sort_keys=True),
-            target=self.target())
-        ).encode('utf-8')).hexdigest()
+        # Records are first looked up by their undecoded properties, which
+        # is cheap when these are all strings (as they are for actions),
+        # and then by their decoded ones.
+
+        raw = self._pending if self._pending is not None else self._properties
+
+        signature = tuple(sorted(raw.items())) \
+            if all([type(v) is str for v in raw.values()]) else None
+
+        (record, number) = Element._raw_records.get(signature, (None, None))
+
+        if record is None:
+
+            decoded = tuple(sorted([
+                (k, v) if type(v) is str
+                else (k, json.dumps(v, sort_keys=True, default=str), None)
+                for k, v in self.properties().items()]))
+
+            with Element._lock:
+
+                if decoded not in Element._records:
+                    Element._records[decoded] = ({
+                        sys.intern(k): sys.intern(v) if isinstance(v, str) else v
+                        for k, v in self._properties.items()},
+                        len(Element._records))
+
+                (record, number) = Element._records[decoded]
+
+                if signature is not None:
+                    Element._raw_records[signature] = (record, number)
+
+        self._properties = record
+        self._pending = None
+        self._id = None
+        self._identity = (
+            None if self._source is None else self._source.id(),
+            self._labels[0],
+            number,
+            None if self._target is None else self._target.id())
+
+        # Tuples do not cache their hash, so it is computed here, once
+
+        self._hash = hash(self._identity)
 
     def source(self):
         return self._source
@@ -126,11 +288,27 @@ class Edge(Element):
         return self._target
 
     def id(self):
+
+        if self._id is None:
+            self._id = hashlib.md5(("({source})-[:{label}{{{properties}}}]->({target})".format(
+                source=self.source(),
+                label=self._labels[0],
+                properties=json.dumps(self.properties(), sort_keys=True),
+                target=self.target())
+            ).encode('utf-8')).hexdigest()
+
         return self._id
 
+    def key(self):
+        return self._identity
+
     def set(self, k, v):
+        self._properties = dict(self.properties())
         super().set(k, v)
-        self._set_id()
+        self._set_record()
+
+    def __hash__(self):
+        return self._hash
 
     def __str__(self):
         return str(self.get("Name"))
@@ -138,17 +316,182 @@ class Edge(Element):
 
 class Elements(list):
 
+    # Elements behaves like a list, but maintains a key -> element and a
+    # label -> elements index alongside it, so that membership tests, lookups
+    # by id, and lookups by label do not require a linear scan (an element's
+    # key is its id, except for edges, see Edge.key). Elements are indexed
+    # when they are added: mutating an element's key afterwards (e.g.
+    # Edge.set) will not be reflected. Removing or replacing an element only
+    # updates the index entries of that element, so elements are listed by
+    # label in the order in which they were indexed. Other indexes over the
+    # collection (e.g. ArnIndex) can be kept in views, which are discarded
+    # whenever the collection changes.
+
+    def __new__(cls, *args, **kwargs):
+
+        # Subclasses (i.e. Ingestors) do not necessarily call __init__
+
+        self = super().__new__(cls)
+        self._ids = {}
+        self._duplicates = {}
+        self._labels = {}
+        self._repeats = {}
+        self.views = {}
+        return self
+
     def __init__(self, _=[], load=False, generics=False):
 
-        super().__init__(_)
+        super().__init__()
+        self.extend(_)
+
+    def _index(self, element):
+
+        key = element.key()
+
+        if key in self._ids:
+            self._duplicates[key] = self._duplicates.get(key, 0) + 1
+        else:
+            self._ids[key] = element
+
+        # Labels map to elements by identity. The same element may be added
+        # more than once, which is counted instead
+
+        labels = element.labels()
+
+        if len(labels) > 0 and id(element) in self._labels.get(labels[0], {}):
+            self._repeats[id(element)] = self._repeats.get(id(element), 0) + 1
+            return
+
+        for label in labels:
+            self._labels.setdefault(label, {})[id(element)] = element
+
+    def _unindex(self, element):
+
+        key = element.key()
+
+        # Other elements may share this element's key, in which case the
+        # first of them takes its place (which requires a scan)
+
+        if key in self._duplicates:
+
+            self._duplicates[key] -= 1
+            if self._duplicates[key] == 0:
+                del self._duplicates[key]
+
+            if self._ids[key] is element:
+                self._ids[key] = next(e for e in self if e.key() == key)
+
+        else:
+            del self._ids[key]
+
+        if id(element) in self._repeats:
+
+            self._repeats[id(element)] -= 1
+            if self._repeats[id(element)] == 0:
+                del self._repeats[id(element)]
+
+        else:
+            for label in element.labels():
+                del self._labels[label][id(element)]
+
+        self.views = {}
+
+    def _reindex(self):
+
+        self._ids = {}
+        self._duplicates = {}
+        self._labels = {}
+        self._repeats = {}
+        self.views = {}
+        for element in self:
+            self._index(element)
+
+    def append(self, element):
+        super().append(element)
+        self._index(element)
+        self.views = {}
+
+    def extend(self, elements):
+        for element in elements:
+            self.append(element)
+
+    def insert(self, i, element):
+        super().insert(i, element)
+        self._reindex()
+
+    def remove(self, element):
+        self.pop(self.index(element))
+
+    def pop(self, i=-1):
+        element = super().pop(i)
+        self._unindex(element)
+        return element
+
+    def clear(self):
+        super().clear()
+        self._reindex()
+
+    def __setitem__(self, i, element):
+
+        if isinstance(i, slice):
+            super().__setitem__(i, element)
+            self._reindex()
+            return
+
+        old = self[i]
+        super().__setitem__(i, element)
+        self._unindex(old)
+        self._index(element)
+
+        # The replacement may precede an element that shares its key
+
+        if element.key() in self._duplicates:
+            self._ids[element.key()] = next(
+                e for e in self if e.key() == element.key())
+
+    def __delitem__(self, i):
+
+        if isinstance(i, slice):
+            super().__delitem__(i)
+            self._reindex()
+            return
+
+        self.pop(i)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __contains__(self, element):
+
+        # Comparing an Element to a string is a label comparison (see
+        # Element.__eq__)
+
+        if isinstance(element, str):
+            return len(self._labels.get(element, {})) > 0
+
+        if not isinstance(element, Element):
+            return False
+
+        return element.key() in self._ids
 
     def __add__(self, other):
         return Elements(list(self) + list(other))
 
+    def find(self, i):
+        return self._ids.get(i)
+
     def get(self, label):
-        return Elements(filter(lambda r: r.type(label), self))
 
-    def save(self, db="default.db", path="/opt/awspx/data"):
+        elements = self._labels.get(label, {}).values()
+
+        if len(self._repeats) > 0:
+            elements = [e for e in elements
+                        for _ in range(self._repeats.get(id(e), 0) + 1)]
+
+        return Elements(elements)
+
+    def save(self, db="default.db", path="/opt/awspx/data", compresslevel=6):
 
         edge_files = []
         node_files = []
@@ -166,51 +509,73 @@ class Elements(list):
                  "Node")
             for e in self])))
 
-        os.mkdir(f"{path}/{directory}")
+        # The archive is written to a temporary file, which is only renamed
+        # once it is complete, so a failed save never leaves a partial zip
+        # behind that could be loaded in its place
 
-        for label in labels:
+        filepath = f"{path}/{directory}.zip"
+        partial = f"{filepath}.partial"
 
-            filename = "%s.csv" % label
-            elements = self.get(label)
+        try:
 
-            if len(elements) == 0:
-                continue
+            with zipfile.ZipFile(partial, mode='w',
+                                 compression=zipfile.ZIP_DEFLATED,
+                                 compresslevel=compresslevel) as archive:
 
-            header = sorted(list(set([
-                (f, e.get(f).__class__.__name__)
-                for e in elements for f in e.properties().keys()])))
+                for label in labels:
 
-            # We default to type: 'str' in cases where key names collide accross types
+                    filename = "%s.csv" % label
+                    elements = self.get(label)
 
-            header = list(set([
-                (f, 'str' if [k for k, _ in header].count(f) > 1 else t)
-                for (f, t) in header]))
+                    if len(elements) == 0:
+                        continue
 
-            if type(elements[0]) is Node or Node in type(elements[0]).__bases__:
+                    # First pass: infer the header. We default to type: 'str' in
+                    # cases where key names collide accross types
 
-                prefix = [":ID"]
-                suffix = [":LABEL"]
-                data = [[e.id()] + [stringify(e.properties()[f], _)
-                                    if f in e.properties()
-                                    else '' for (f, _) in header]
-                        + [";".join(e.labels())] for e in elements]
+                    types = {}
+                    for e in elements:
+                        for f, v in e.properties().items():
+                            types.setdefault(f, set()).add(v.__class__.__name__)
 
-                node_files.append(filename)
+                    header = sorted([(f, next(iter(t)) if len(t) == 1 else 'str')
+                                     for f, t in types.items()])
 
-            else:
+                    # Second pass: rows are generated as they are written
 
-                prefix = [":START_ID"]
-                suffix = [":END_ID", ":TYPE"]
+                    if type(elements[0]) is Node or Node in type(elements[0]).__bases__:
 
-                data = [[e.source().id()] + [stringify(e.properties()[f], _)
-                                             if f in e.properties()
-                                             else '' for (f, _) in header]
-                        + [e.target().id(), label] for e in elements if e.target() is not None]
+                        prefix = [":ID"]
+                        suffix = [":LABEL"]
+                        data = ([e.id()] + [stringify(e.properties()[f], _)
+                                            if f in e.properties()
+                                            else '' for (f, _) in header]
+                                + [";".join(e.labels())] for e in elements)
 
-                edge_files.append(filename)
+                        node_files.append(filename)
 
-            data.insert(0,
-                        prefix + ["%s:%s" % (k, {
+                    else:
+
+                        prefix = [":START_ID"]
+                        suffix = [":END_ID", ":TYPE"]
+
+                        data = ([e.source().id()] + [stringify(e.properties()[f], _)
+                                                     if f in e.properties()
+                                                     else '' for (f, _) in header]
+                                + [e.target().id(), label] for e in elements if e.target() is not None)
+
+                        edge_files.append(filename)
+
+                    with io.TextIOWrapper(archive.open(filename, mode='w'),
+                                          encoding="utf-8", newline='') as csvfile:
+
+                        c = csv.writer(
+                            csvfile,
+                            delimiter=',',
+                            quotechar='"',
+                            quoting=csv.QUOTE_MINIMAL)
+
+                        c.writerow(prefix + ["%s:%s" % (k, {
                             t:           t,
                             "NoneType": "string",
                             "dict":     "string",
@@ -221,23 +586,56 @@ class Elements(list):
                             "str":      "string"
                         }[t]) for (k, t) in header] + suffix)
 
-            with open('%s/%s/%s' % (path, directory, filename), mode='w') as elements:
+                        c.writerows(data)
+
+            os.replace(partial, filepath)
+
+        except BaseException:
+
+            if os.path.exists(partial):
+                os.remove(partial)
+
+            raise
+
+        return filepath
+
+    def snapshot(self, owners={}, nodes=None):
+
+        # Summarises this graph so that a later run can be diffed against it:
+        # nodes by their digest, and edges by their endpoints and
+        # (exported) properties. Edges are attributed to the resource whose
+        # policy produced them, if any (see owners). Node digests can be taken
+        # from an earlier snapshot, as resolving policies modifies them.
+
+        def label(e): return next((l for l in e.labels()
+                                   if l in ["External", "Generic", "Resource"]),
+                                  e.labels()[0])
+
+        def endpoint(e): return [label(e), e._key, e.id()]
 
-                c = csv.writer(
-                    elements,
-                    delimiter=',',
-                    quotechar='"',
-                    quoting=csv.QUOTE_MINIMAL)
+        edges = {}
+        snapshot = nodes is None
+        nodes = {} if snapshot else nodes
 
-                for row in data:
-                    c.writerow(row)
+        for e in self:
 
-        shutil.make_archive(f"{path}/{directory}",
-                            'zip', f"{path}/{directory}")
+            if snapshot and isinstance(e, Node) and not e.type("External"):
+                nodes[e.id()] = {
+                    "Label": label(e),
+                    "Key": e._key,
+                    "Digest": e.digest()
+                }
 
-        subprocess.Popen(["rm", "-rf", f"{path}/{directory}"])
+            elif isinstance(e, Edge) and e.target() is not None:
+                edges[e.id()] = {
+                    "Owner": owners.get(e.key()),
+                    "Type": e.labels()[0],
+                    "Source": endpoint(e.source()),
+                    "Target": endpoint(e.target()),
+                    "Properties": e.export()
+                }
 
-        return f"{path}/{directory}.zip"
+        return {"Nodes": nodes, "Edges": edges}
 
     def __repr__(self):
         return str([str(e) for e in self])
@@ -1,10 +1,13 @@
+import gzip
 import os
 import re
 import shutil
 import subprocess
+import threading
 import time
+import zipfile
 
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
 from neobolt import exceptions
 
 
@@ -14,19 +17,60 @@ class Neo4j(object):
     username = "neo4j"
     password = "neo4j"
 
+    # Connection pool (shared by all queries)
+
+    pool_size = 50
+    connection_timeout = 30
+    acquisition_timeout = 60
+    max_retry_time = 30
+
+    _driver = None
+    _lock = threading.Lock()
+
     # Disable Debug
     # print=str
 
     @staticmethod
-    def run(cypher):
-        driver = GraphDatabase.driver(
-            Neo4j.connection,
-            auth=(Neo4j.username, Neo4j.password))
-        with driver.session() as session:
-            results = session.run(cypher)
-        driver.close()
+    def driver():
+
+        with Neo4j._lock:
+
+            if Neo4j._driver is None:
+                Neo4j._driver = GraphDatabase.driver(
+                    Neo4j.connection,
+                    auth=(Neo4j.username, Neo4j.password),
+                    max_connection_pool_size=Neo4j.pool_size,
+                    connection_timeout=Neo4j.connection_timeout,
+                    connection_acquisition_timeout=Neo4j.acquisition_timeout,
+                    max_retry_time=Neo4j.max_retry_time)
+
+            return Neo4j._driver
+
+    @staticmethod
+    def close():
+
+        with Neo4j._lock:
+
+            if Neo4j._driver is not None:
+                Neo4j._driver.close()
+                Neo4j._driver = None
+
+    @staticmethod
+    def run(cypher, parameters=None):
+        with Neo4j.driver().session() as session:
+            results = session.run(cypher, parameters)
         return results
 
+    @staticmethod
+    def read(cypher, parameters=None):
+        with Neo4j.driver().session(access_mode=READ_ACCESS) as session:
+            return session.read_transaction(Neo4j._run, cypher, parameters)
+
+    @staticmethod
+    def write(cypher, parameters=None):
+        with Neo4j.driver().session(access_mode=WRITE_ACCESS) as session:
+            return session.write_transaction(Neo4j._run, cypher, parameters)
+
     @staticmethod
     def isrunning():
 
@@ -43,8 +87,10 @@ class Neo4j(object):
         try:
             GraphDatabase.driver(
                 Neo4j.connection,
-                auth=(Neo4j.username, Neo4j.password)
-            ).session()
+                auth=(Neo4j.username, Neo4j.password),
+                connection_timeout=Neo4j.connection_timeout,
+                max_retry_time=0
+            ).close()
 
         except exceptions.ServiceUnavailable:
             return False
@@ -69,6 +115,7 @@ class Neo4j(object):
 
     @staticmethod
     def stop():
+        Neo4j.close()
         if Neo4j.isrunning():
             subprocess.Popen(["killall", "java"])
             for _ in range(10):
@@ -102,9 +149,28 @@ class Neo4j(object):
         Neo4j.stop()
         Neo4j.delete(db)
 
+        # Entries are streamed out of the archive into gzipped CSVs, which
+        # neo4j-admin reads directly, rather than being unpacked. They cannot
+        # be imported (and removed) one at a time: neo4j-admin import builds
+        # the database from every node and relationship file in a single
+        # offline run, and reads its inputs more than once, so they must all
+        # be seekable files on disk while it runs. Compressing them keeps
+        # the extra space needed close to the size of the archive, rather
+        # than to that of its contents.
+
         directory = archive.split('.')[0]
-        shutil.unpack_archive(archive, directory, "zip")
-        csvs = [f for f in os.listdir(directory) if f.endswith(".csv")]
+        os.makedirs(directory, exist_ok=True)
+
+        csvs = []
+
+        with zipfile.ZipFile(archive) as z:
+            for entry in [e for e in z.namelist() if e.endswith(".csv")]:
+                csv = f"{os.path.basename(entry)}.gz"
+                with z.open(entry) as source, \
+                        gzip.open(f"{directory}/{csv}", "wb", compresslevel=1) as target:
+                    shutil.copyfileobj(source, target)
+                csvs.append(csv)
+
         edges = [e for e in csvs if re.compile("([A-Z]+)\.csv").match(e)]
         nodes = [n for n in csvs if n not in edges]
 
@@ -135,6 +201,7 @@ class Neo4j(object):
 
         if stats is None:
             print(str(stdout).replace("\\n", "\n").replace("\\t", "\t"))
+            shutil.rmtree(directory, ignore_errors=True)
             return False
 
         (time, nodes, edges, props, ram) = stats.groups()
@@ -146,16 +213,82 @@ class Neo4j(object):
             db=db
         ))
 
-        subprocess.Popen(["rm", "-rf", f"{directory}/"])
+        shutil.rmtree(directory, ignore_errors=True)
 
         Neo4j.switch_database(db)
         Neo4j.start()
 
+    @staticmethod
+    def update(db, nodes=[], edges=[], deleted_nodes=[], deleted_edges=[], batch=1000):
+
+        # Apply a difference to an existing database, in place. Nodes are
+        # identified by their label (Resource, Generic, or External) and key
+        # property, edges by their endpoints, type, and properties. External
+        # nodes that are left without any relationships are removed.
+
+        if not os.path.isdir(f"/data/databases/{db}"):
+            print(f"[-] Database '{db}' does not exist.")
+            return False
+
+        Neo4j.switch_database(db)
+        Neo4j.restart()
+
+        def node(name, label, key, value):
+            return f"({name}:`{label}` {{`{key}`: {value}}})"
+
+        def apply(rows, group, cypher):
+            groups = {}
+            for row in rows:
+                groups.setdefault(group(row), []).append(row)
+            for g, rows in groups.items():
+                for i in range(0, len(rows), batch):
+                    Neo4j.write("UNWIND $rows AS row " + cypher(*g),
+                              {"rows": rows[i:i + batch]})
+
+        apply(deleted_edges,
+              lambda e: (e["Type"], *e["Source"][:2], *e["Target"][:2]),
+              lambda t, sl, sk, tl, tk: (
+                  f"MATCH {node('s', sl, sk, 'row.Source[2]')}"
+                  f"-[r:`{t}`]->{node('t', tl, tk, 'row.Target[2]')} "
+                  "WHERE ALL(k IN KEYS(row.Properties) WHERE r[k] = row.Properties[k]) "
+                  "DELETE r"))
+
+        apply(deleted_nodes,
+              lambda n: (n["Label"], n["Key"]),
+              lambda l, k: (
+                  f"MATCH {node('n', l, k, 'row.Id')} "
+                  "DETACH DELETE n"))
+
+        apply(nodes,
+              lambda n: (n["Label"], n["Key"], *n["Labels"]),
+              lambda l, k, *labels: (
+                  f"MERGE {node('n', l, k, 'row.Id')} "
+                  "SET n = row.Properties "
+                  f"SET n:{':'.join([f'`{x}`' for x in labels])}"))
+
+        apply(edges,
+              lambda e: (e["Type"], *e["Source"][:2], *e["Target"][:2]),
+              lambda t, sl, sk, tl, tk: (
+                  f"MATCH {node('s', sl, sk, 'row.Source[2]')}, "
+                  f"{node('t', tl, tk, 'row.Target[2]')} "
+                  f"CREATE (s)-[r:`{t}`]->(t) "
+                  "SET r = row.Properties"))
+
+        Neo4j.write("MATCH (n:External) WHERE NOT (n)--() DELETE n")
+
+        print(f"[+] Updated '{db}': {len(nodes)} node(s) added or changed, "
+              f"{len(deleted_nodes)} removed, {len(edges)} edge(s) added, "
+              f"{len(deleted_edges)} removed.")
+
+        return True
+
     @staticmethod
     def delete(db):
-        subprocess.Popen(["rm", "-rf", "/data/databases/%s" % db])
+        shutil.rmtree("/data/databases/%s" % db, ignore_errors=True)
 
     @staticmethod
-    def _run(tx, cypher):
-        results = tx.run(cypher)
+    def _run(tx, cypher, parameters=None):
+        results = tx.run(cypher, parameters)
+        # Buffer the results, so that they outlive the transaction
+        results.detach()
         return results
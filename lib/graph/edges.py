@@ -1,20 +1,27 @@
-from lib.graph.base import Edge, json
+from lib.aws.numbers import NUMBERS
+from lib.graph.base import ACTIONS, Edge, Elements, json
 
 
 class Associative(Edge):
 
+    __slots__ = []
+
     def __init__(self,  properties={}, source=None, target=None):
         super().__init__(properties, source, target)
 
 
 class Transitive(Edge):
 
+    __slots__ = []
+
     def __init__(self,  properties={}, source=None, target=None):
         super().__init__(properties, source, target)
 
 
 class Action(Edge):
 
+    __slots__ = []
+
     def __init__(self,  properties={}, source=None, target=None):
 
         for key in ["Name", "Description", "Effect", "Access", "Reference", "Condition"]:
@@ -26,6 +33,88 @@ class Action(Edge):
 
 class Trusts(Action):
 
+    __slots__ = []
+
+    def __init__(self,  properties={}, source=None, target=None):
+
+        super().__init__(properties, source, target)
+
+
+class Grant(Edge):
+
+    __slots__ = []
+
     def __init__(self,  properties={}, source=None, target=None):
 
+        for key in ["Name", "Description", "Effect", "Condition"]:
+            if key not in properties:
+                raise ValueError("Edge properties must include '%s'" % key)
+
         super().__init__(properties, source, target)
+
+
+class ActionSet(Edge):
+
+    # Actions that share a source, target, effect and condition, packed into
+    # one edge. Actions are numbered by an append-only table (see
+    # lib/aws/numbers.py), so that numbers already stored in Neo4j, or in a
+    # snapshot, keep their meaning when ACTIONS is updated. They are stored
+    # as a sorted list of these numbers (see members). Actions without a
+    # number are left as they are.
+
+    __slots__ = []
+
+    numbers = {a: n for a, n in NUMBERS.items() if a in ACTIONS}
+
+    def __init__(self,  properties={}, source=None, target=None):
+
+        for key in ["Name", "Effect", "Condition", "Actions"]:
+            if key not in properties:
+                raise ValueError("Edge properties must include '%s'" % key)
+
+        super().__init__(properties, source, target)
+
+    @staticmethod
+    def pack(actions):
+
+        # Actions (edges) are packed by source, target, effect and condition.
+        # Any other edges are returned as they are.
+
+        (sets, edges, conditions) = ({}, Elements(), {})
+
+        for action in actions:
+
+            if action.labels() != ["ACTION"] \
+                    or str(action) not in ActionSet.numbers:
+                edges.append(action)
+                continue
+
+            # Conditions are compared as JSON, which property records share
+
+            condition = action.get("Condition")
+            if id(condition) not in conditions:
+                conditions[id(condition)] = (condition, json.dumps(
+                    condition, sort_keys=True, default=str))
+
+            sets.setdefault((action.source(), action.target(), action.get("Effect"),
+                             conditions[id(condition)][1]),
+                            (action, set()))[1].add(str(action))
+
+        for (source, target, _, _), (action, names) in sets.items():
+            edges.append(ActionSet({
+                "Name": "Actions",
+                "Effect": action.get("Effect"),
+                "Condition": action.get("Condition"),
+                "Actions": sorted([ActionSet.numbers[n] for n in names])
+            }, source=source, target=target))
+
+        return edges
+
+    @staticmethod
+    def members(edge):
+
+        # Cypher expression for the numbers in `edge`'s set, as strings. The
+        # list is stored as JSON, i.e. "[1, 2, 3]".
+
+        return (f"SPLIT(SUBSTRING({edge}.Actions, 1, "
+                f"SIZE({edge}.Actions) - 2), ', ')")
@@ -3,6 +3,8 @@ from lib.graph.base import Node
 
 class Generic(Node):
 
+    __slots__ = []
+
     def __init__(self, properties={}, labels=[]):
 
         label = self.__class__.__name__
@@ -14,6 +16,8 @@ class Generic(Node):
 
 class Resource(Node):
 
+    __slots__ = []
+
     def __init__(self, properties={}, labels=[], key="Arn"):
 
         label = self.__class__.__name__
@@ -28,6 +32,8 @@ class Resource(Node):
 
 class External(Node):
 
+    __slots__ = []
+
     def __init__(self, properties={}, labels=[], key="Name"):
 
         label = self.__class__.__name__